@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from xml.dom import minidom
 from elifearticle import utils as eautils
 from elifetools import utils_html
@@ -8,6 +9,23 @@ from elifetools.parseJATS import XML_NAMESPACES
 from elifecrossref import tags, utils
 
 
+# tags renamed to jats: tags keeping any attributes
+JATS_ATTRIBUTE_TAGS = ('sec', 'related-object', 'title', 'inline-formula', 'ext-link', 'xref')
+
+# tags renamed to jats: tags only when they have no attributes
+JATS_INLINE_TAGS = ('p', 'italic', 'bold', 'underline', 'sub', 'sup', 'sc')
+
+# all the open and close tags renamed for a JATS abstract, matched in one pass
+JATS_TAG_PATTERN = re.compile(r'<(%s)(.*?)>|<(%s)>|</(%s)>' % (
+    '|'.join(re.escape(tag) for tag in JATS_ATTRIBUTE_TAGS),
+    '|'.join(re.escape(tag) for tag in JATS_INLINE_TAGS),
+    '|'.join(re.escape(tag) for tag in JATS_ATTRIBUTE_TAGS + JATS_INLINE_TAGS)))
+
+RID_ATTRIBUTE_PATTERN = re.compile(r'\s+rid=".*?"')
+
+NEWLINE_AFTER_TAG_PATTERN = re.compile('>\n')
+
+
 def set_abstract(parent, poa_article, crossref_config):
     if hasattr(poa_article, 'abstract_xml') and poa_article.abstract_xml:
         set_abstract_tag(parent, abstract=poa_article.abstract_xml, abstract_type="abstract",
@@ -76,6 +94,32 @@ def get_jats_abstract(abstract):
     abstract = etoolsutils.escape_ampersand(abstract)
     abstract = etoolsutils.escape_unmatched_angle_brackets(abstract, utils.allowed_tags())
 
+    abstract = convert_jats_tags(abstract)
+
+    # remove rid attributes
+    abstract = RID_ATTRIBUTE_PATTERN.sub('', abstract)
+
+    return abstract
+
+
+def jats_tag_replacement(match):
+    if match.group(1):
+        return '<jats:%s%s>' % (match.group(1), match.group(2))
+    if match.group(3):
+        return '<jats:%s>' % match.group(3)
+    return '</jats:%s>' % match.group(4)
+
+
+def convert_jats_tags(abstract):
+    """rename the JATS tags in the abstract to jats: tags"""
+    if tags.NESTED_ANGLE_BRACKET_PATTERN.search(abstract):
+        # one tag could be inside another, rename one tag at a time
+        return convert_jats_tags_in_order(abstract)
+    return JATS_TAG_PATTERN.sub(jats_tag_replacement, abstract)
+
+
+def convert_jats_tags_in_order(abstract):
+    """rename the JATS tags in the abstract to jats: tags, one tag at a time"""
     abstract = replace_jats_tag('sec', 'jats:sec', abstract)
     abstract = replace_jats_tag('related-object', 'jats:related-object', abstract)
     abstract = replace_jats_tag('title', 'jats:title', abstract)
@@ -92,9 +136,6 @@ def get_jats_abstract(abstract):
     abstract = replace_jats_tag('ext-link', 'jats:ext-link', abstract)
     abstract = replace_jats_tag('xref', 'jats:xref', abstract)
 
-    # remove rid attributes
-    abstract = remove_tag_attr('rid', abstract)
-
     return abstract
 
 
@@ -110,15 +151,16 @@ def set_abstract_tag(parent, abstract, abstract_type=None, jats_abstract=False):
     else:
         tag_converted_abstract = get_basic_abstract(abstract)
 
-    tag_converted_abstract = re.sub('>\n', '>', tag_converted_abstract)
+    tag_converted_abstract = NEWLINE_AFTER_TAG_PATTERN.sub('>', tag_converted_abstract)
 
     minidom_tag = xmlio.reparsed_tag(
         tag_name, tag_converted_abstract, attributes_text=attributes_text)
 
     # add extra namespace attributes to jats:p tags if applicable
+    namespace_indexes = child_namespace_indexes(minidom_tag)
     for p_tag in minidom_tag.getElementsByTagName('jats:p'):
         if p_tag.hasChildNodes():
-            attributes_added = add_namespace_attributes(p_tag)
+            attributes_added = add_namespace_attributes(p_tag, namespace_indexes.get(p_tag))
             for attribute in attributes_added:
                 if attribute not in attributes:
                     attributes.append(attribute)
@@ -126,38 +168,61 @@ def set_abstract_tag(parent, abstract, abstract_type=None, jats_abstract=False):
     tags.append_tag(parent, minidom_tag, attributes=attributes)
 
 
-def add_namespace_attributes(minidom_element):
-    "add namespace attributes to the minidom Element if it contains namespaced tags or attributes"
+def add_namespace_attributes(minidom_element, namespace_indexes=None):
+    """
+    add namespace attributes to the minidom Element if it contains namespaced tags or attributes,
+    namespace_indexes are the XML_NAMESPACES indexes used in the element if already known
+    """
+    if namespace_indexes is None:
+        namespace_indexes = child_namespace_indexes(minidom_element).get(minidom_element)
     attributes = []
-    tag_names, attribute_names = child_element_value_names(minidom_element)
-    for namespace in XML_NAMESPACES:
-        for tag_name in set.union(tag_names, attribute_names):
-            if tag_name.startswith(namespace.get('prefix')):
-                minidom_element.setAttributeNS(
-                    namespace.get('uri'), namespace.get('attribute'), namespace.get('uri'))
-                attributes.append(namespace.get('attribute'))
+    for index in sorted(namespace_indexes):
+        namespace = XML_NAMESPACES[index]
+        minidom_element.setAttributeNS(
+            namespace.get('uri'), namespace.get('attribute'), namespace.get('uri'))
+        attributes.append(namespace.get('attribute'))
     return attributes
 
 
-def child_element_value_names(minidom_tag, tag_names=None, attribute_names=None):
-    "recursively get a list of all child element tag names and attribute names"
-
-    if tag_names is None:
-        tag_names = set()
-
-    if attribute_names is None:
-        attribute_names = set()
-
-    # process the Element nodes only
-    for child_element in [child for child in minidom_tag.childNodes
-                          if isinstance(child, minidom.Element)]:
-        tag_names.add(child_element.tagName)
-        for i in range(0, child_element.attributes.length):
-            attribute_names.add(child_element.attributes.item(i).name)
-
-        if child_element.hasChildNodes():
-            # call again recursively for all other child nodes
-            tag_names, attribute_names = child_element_value_names(
-                child_element, tag_names, attribute_names)
-
-    return tag_names, attribute_names
+def namespace_index(name):
+    """index of the XML_NAMESPACES namespace of a tag or attribute name, or None"""
+    colon_index = name.find(':')
+    if colon_index < 0:
+        return None
+    prefix_index = namespace_prefix_index()
+    index = prefix_index.get(name[:colon_index + 1])
+    if index is None:
+        index = prefix_index.get(name[:colon_index])
+    return index
+
+
+@lru_cache(maxsize=None)
+def namespace_prefix_index():
+    return {namespace.get('prefix'): index for index, namespace in enumerate(XML_NAMESPACES)}
+
+
+def child_namespace_indexes(minidom_tag):
+    """
+    map each node in the minidom tree to the set of XML_NAMESPACES indexes used by the
+    tag names and attribute names of all the elements inside it, in one traversal
+    """
+    namespace_indexes = {}
+    stack = [(minidom_tag, False)]
+    while stack:
+        node, children_visited = stack.pop()
+        child_elements = [child for child in node.childNodes
+                          if isinstance(child, minidom.Element)]
+        if not children_visited:
+            # visit the child elements before the node itself
+            stack.append((node, True))
+            stack.extend((child, False) for child in child_elements)
+            continue
+        node_indexes = set()
+        for child_element in child_elements:
+            node_indexes.update(namespace_indexes.get(child_element))
+            for name in [child_element.tagName] + list(child_element.attributes.keys()):
+                index = namespace_index(name)
+                if index is not None:
+                    node_indexes.add(index)
+        namespace_indexes[node] = node_indexes
+    return namespace_indexes
@@ -1,8 +1,10 @@
 from xml.etree.ElementTree import SubElement
+from elifecrossref import plan
 
 
 def do_access_indicators(poa_article, crossref_config):
-    return bool(crossref_config.get("access_indicators_applies_to") and has_license(poa_article))
+    return bool(plan.value(crossref_config, 'access_indicators_applies_to')
+                and has_license(poa_article))
 
 
 def set_access_indicators(parent, poa_article, crossref_config):
@@ -11,7 +13,7 @@ def set_access_indicators(parent, poa_article, crossref_config):
     """
     if do_access_indicators(poa_article, crossref_config):
         ai_program_tag = set_ai_program(parent)
-        applies_to_list = crossref_config.get("access_indicators_applies_to")
+        applies_to_list = plan.value(crossref_config, 'access_indicators_applies_to')
         for applies_to in applies_to_list:
             set_ai_license_ref(
                 ai_program_tag, poa_article.license.href, applies_to)
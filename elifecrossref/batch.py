@@ -0,0 +1,163 @@
+"""
+split a list of articles into more than one Crossref deposit, by a maximum number of
+articles or a maximum file size in bytes, each deposit with its own batch id
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from elifecrossref import body, generate, serialize
+from elifecrossref.conf import cached_config
+
+
+def encoded_length(string):
+    return len(string.encode(serialize.ENCODING))
+
+
+def records_size(record_tags, pretty=False, indent=""):
+    """bytes the record tags take up in the body of the output"""
+    addindent, newl = serialize.whitespace(pretty, indent)
+    parts = []
+    for record_tag in record_tags:
+        serialize.write_node(parts.append, record_tag, addindent * 2, addindent, newl)
+    return encoded_length(''.join(parts))
+
+
+def empty_size(poa_article, crossref_config, pub_date, add_comment, submission_type,
+               batch_number, pretty=False, indent=""):
+    """bytes of a deposit starting with the poa_article, not counting its records"""
+    c_xml = generate.CrossrefXMLRecords(
+        [poa_article], [], crossref_config, pub_date, add_comment, submission_type,
+        batch_number)
+    addindent, newl = serialize.whitespace(pretty, indent)
+    # the empty body is written as <body/>, with records it has a start and end tag
+    body_tags = '<body>' + newl + addindent + '</body>'
+    return (encoded_length(c_xml.output_xml(pretty=pretty, indent=indent)) +
+            encoded_length(body_tags) - encoded_length('<body/>'))
+
+
+def numbers(batch_count):
+    """batch numbers for the batch ids, none if the articles fit in one batch"""
+    if batch_count == 1:
+        return [None]
+    return range(1, batch_count + 1)
+
+
+def split_by_count(poa_articles, max_articles=None):
+    """split the articles into lists of at most max_articles, one list if it is not set"""
+    if not max_articles:
+        return [list(poa_articles)] if poa_articles else []
+    return [poa_articles[index:index + max_articles]
+            for index in range(0, len(poa_articles), max_articles)]
+
+
+def split_by_size(sizes, overhead, max_bytes, max_articles=None):
+    """
+    split article indexes into batches whose total size is at most max_bytes,
+    overhead(index, batch_number) is the size of a batch starting with the article index,
+    an article bigger than max_bytes on its own is put in a batch by itself
+    """
+    batches = []
+    batch = []
+    batch_size = 0
+    for index, size in enumerate(sizes):
+        if batch and (
+                (max_articles and len(batch) >= max_articles) or batch_size + size > max_bytes):
+            batches.append(batch)
+            batch = []
+        if not batch:
+            batch_size = overhead(index, len(batches) + 1)
+        batch.append(index)
+        batch_size += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def build_batch(poa_articles, batch_number, crossref_config, pub_date, add_comment,
+                submission_type, pretty, indent):
+    """build one deposit, returns the batch id and the XML string"""
+    c_xml = generate.CrossrefXML(poa_articles, crossref_config, pub_date, add_comment,
+                                 submission_type, batch_number=batch_number)
+    return c_xml.batch_id, c_xml.output_xml(pretty=pretty, indent=indent)
+
+
+def batches_by_count(poa_articles, crossref_config, pub_date, add_comment, submission_type,
+                     pretty, indent, max_articles, workers=None):
+    article_batches = split_by_count(poa_articles, max_articles)
+    batch_numbers = numbers(len(article_batches))
+    build_function = partial(
+        build_batch, crossref_config=crossref_config, pub_date=pub_date,
+        add_comment=add_comment, submission_type=submission_type, pretty=pretty, indent=indent)
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(build_function, article_batches, batch_numbers))
+    return list(map(build_function, article_batches, batch_numbers))
+
+
+def batches_by_size(poa_articles, crossref_config, pub_date, add_comment, submission_type,
+                    pretty, indent, max_articles, max_bytes, workers=None):
+    # build the records once, to measure them and then to add them to their batch
+    if workers and workers > 1:
+        article_records = body.build_records_parallel(
+            poa_articles, crossref_config, pub_date, submission_type, workers)
+    else:
+        article_records = [
+            body.build_records(poa_article, crossref_config, pub_date, submission_type)
+            for poa_article in poa_articles]
+    sizes = [records_size(record_tags, pretty, indent) for record_tags in article_records]
+
+    def overhead(index, batch_number):
+        return empty_size(poa_articles[index], crossref_config, pub_date, add_comment,
+                          submission_type, batch_number, pretty, indent)
+
+    batches = []
+    article_batches = split_by_size(sizes, overhead, max_bytes, max_articles)
+    for batch_number, indexes in zip(numbers(len(article_batches)), article_batches):
+        record_tags = [
+            record_tag for index in indexes for record_tag in article_records[index]]
+        c_xml = generate.CrossrefXMLRecords(
+            [poa_articles[index] for index in indexes], record_tags, crossref_config, pub_date,
+            add_comment, submission_type, batch_number)
+        batches.append((c_xml.batch_id, c_xml.output_xml(pretty=pretty, indent=indent)))
+    return batches
+
+
+def crossref_xml_batches(poa_articles, crossref_config=None, pub_date=None, add_comment=True,
+                         submission_type='journal', pretty=False, indent="", max_articles=None,
+                         max_bytes=None, workers=None):
+    """
+    build the deposits for the articles, returns a list of batch id and XML string pairs,
+    max_articles and max_bytes default to the batch_max_articles and batch_max_bytes config,
+    a value of 0 means no limit
+    """
+    if not crossref_config:
+        crossref_config = cached_config(None)
+    poa_articles = list(poa_articles)
+    if max_articles is None:
+        max_articles = crossref_config.get('batch_max_articles')
+    if max_bytes is None:
+        max_bytes = crossref_config.get('batch_max_bytes')
+    # use one pub date for every batch so their batch ids are consistent
+    if pub_date is None:
+        pub_date = time.gmtime()
+    if max_bytes:
+        return batches_by_size(poa_articles, crossref_config, pub_date, add_comment,
+                               submission_type, pretty, indent, max_articles, max_bytes, workers)
+    return batches_by_count(poa_articles, crossref_config, pub_date, add_comment,
+                            submission_type, pretty, indent, max_articles, workers)
+
+
+def crossref_xml_batches_to_disk(poa_articles, crossref_config=None, pub_date=None,
+                                 add_comment=True, submission_type='journal', pretty=False,
+                                 indent="", max_articles=None, max_bytes=None, workers=None):
+    """build the deposits and write each to a file in the TMP_DIR, returns the file names"""
+    file_names = []
+    for batch_id, xml_string in crossref_xml_batches(
+            poa_articles, crossref_config, pub_date, add_comment, submission_type, pretty,
+            indent, max_articles, max_bytes, workers):
+        file_name = generate.TMP_DIR + os.sep + batch_id + '.xml'
+        with open(file_name, "wb") as open_file:
+            open_file.write(xml_string.encode(serialize.ENCODING))
+        file_names.append(file_name)
+    return file_names
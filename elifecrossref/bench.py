@@ -0,0 +1,415 @@
+"""
+benchmark the Crossref XML generation stages over a directory of JATS XML files,
+run with python -m elifecrossref.bench from the project directory
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from xml.etree.ElementTree import Element
+
+from elifetools import xmlio
+
+import elifecrossref
+from elifecrossref import body, clinical_trials, conf, engine, generate, plan, synthetic, tags
+from elifecrossref.instrument import summarise, timed
+
+
+DATA_DIR = os.path.join('tests', 'test_data')
+
+REGISTRIES_FILE = os.path.join('tests', 'fixtures', 'clinical_trial_registries.xml')
+
+SUBMISSION_TYPES = generate.SUBMISSION_TYPES
+
+PUB_DATE = time.strptime("2017-07-17 07:17:07", "%Y-%m-%d %H:%M:%S")
+
+# synthetic article parts varied by the scaling benchmark, other parts are left at their default
+SCALING_DIMENSIONS = ('contributors', 'refs', 'components', 'datasets', 'funding_awards')
+
+SCALING_SIZES = (10, 100, 1000)
+
+BATCH_SIZE = 1000
+
+# parts of each synthetic article in the batch benchmark
+BATCH_ARTICLE_PARTS = {'contributors': 5, 'refs': 20, 'components': 5, 'datasets': 2,
+                       'funding_awards': 2}
+
+# inline markup like that in titles and citations, for the inline tag benchmark
+INLINE_TAG_STRINGS = (
+    'A plain title',
+    'An <i>italic</i> and <b>bold <sub>1</sub></b> title &#945;',
+    'Smith J, Jones K. 2017. <i>A title</i> with a '
+    '<ext-link xlink:href="https://example.org">link</ext-link>. <b>6</b>:e00666',
+)
+
+INLINE_TAG_NUMBER = 1000
+
+
+def article_xml_files(data_dir=DATA_DIR):
+    """JATS XML files in the data_dir, the Crossref output files have crossref in their name"""
+    return sorted(
+        os.path.join(data_dir, file_name) for file_name in os.listdir(data_dir)
+        if file_name.endswith('.xml') and 'crossref' not in file_name)
+
+
+def config_section(article_xml, config_file=None):
+    """config section whose name the file name starts with, e.g. elife for elife-00666.xml"""
+    file_name = os.path.basename(article_xml)
+    for section in conf.load_config(config_file).sections():
+        if file_name.startswith(section):
+            return section
+    return None
+
+
+def peak_memory(function, *args, **kwargs):
+    """call the function and return the peak bytes allocated while it ran"""
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    function(*args, **kwargs)
+    return tracemalloc.get_traced_memory()[1] - baseline
+
+
+def load_crossref_configs(article_xmls, config_file=None):
+    return {
+        article_xml: conf.cached_config(config_section(article_xml, config_file), config_file)
+        for article_xml in article_xmls}
+
+
+def preload_registries(crossref_configs, registries_file=REGISTRIES_FILE):
+    """use the local registries XML so clinical trials do not fetch the registry"""
+    if not registries_file or not os.path.exists(registries_file):
+        return
+    with open(registries_file, 'rb') as open_file:
+        registries_xml = open_file.read()
+    for crossref_config in crossref_configs.values():
+        if crossref_config.get('clinical_trials_registries'):
+            clinical_trials.preload_registries(
+                crossref_config.get('clinical_trials_registries'), registries_xml)
+
+
+def time_stages(article_xmls, crossref_configs, submission_types=SUBMISSION_TYPES, repeat=1):
+    """time each stage for each file, returns a map of stage name to list of timings"""
+    timings = {'build_articles_for_crossref': []}
+    for submission_type in submission_types:
+        timings[submission_type] = {'build_crossref_xml': [], 'output_xml': []}
+    for _ in range(repeat):
+        for article_xml in article_xmls:
+            articles, seconds = timed(generate.build_articles_for_crossref, [article_xml])
+            timings['build_articles_for_crossref'].append(seconds)
+            for submission_type in submission_types:
+                c_xml, seconds = timed(
+                    generate.build_crossref_xml, articles, crossref_configs.get(article_xml),
+                    PUB_DATE, False, submission_type)
+                timings[submission_type]['build_crossref_xml'].append(seconds)
+                _, seconds = timed(c_xml.output_xml, pretty=True, indent="\t")
+                timings[submission_type]['output_xml'].append(seconds)
+    return timings
+
+
+def measure_memory(article_xmls, crossref_configs, submission_types=SUBMISSION_TYPES):
+    """largest peak bytes allocated by each stage for any one file"""
+    memory = {'build_articles_for_crossref': 0}
+    for submission_type in submission_types:
+        memory[submission_type] = {'build_crossref_xml': 0, 'output_xml': 0}
+    tracemalloc.start()
+    try:
+        for article_xml in article_xmls:
+            memory['build_articles_for_crossref'] = max(
+                memory['build_articles_for_crossref'],
+                peak_memory(generate.build_articles_for_crossref, [article_xml]))
+            articles = generate.build_articles_for_crossref([article_xml])
+            for submission_type in submission_types:
+                crossref_config = crossref_configs.get(article_xml)
+                stage_memory = memory[submission_type]
+                stage_memory['build_crossref_xml'] = max(
+                    stage_memory['build_crossref_xml'],
+                    peak_memory(generate.build_crossref_xml, articles, crossref_config,
+                                PUB_DATE, False, submission_type))
+                c_xml = generate.build_crossref_xml(
+                    articles, crossref_config, PUB_DATE, False, submission_type)
+                stage_memory['output_xml'] = max(
+                    stage_memory['output_xml'],
+                    peak_memory(c_xml.output_xml, pretty=True, indent="\t"))
+    finally:
+        tracemalloc.stop()
+    return memory
+
+
+def run_benchmark(article_xmls, submission_types=SUBMISSION_TYPES, repeat=1, config_file=None,
+                  registries_file=REGISTRIES_FILE, memory=True, engine_name=None):
+    """
+    benchmark the stages for the article_xmls using the XML engine
+    and return the results as a dict
+    """
+    crossref_configs = load_crossref_configs(article_xmls, config_file)
+    preload_registries(crossref_configs, registries_file)
+    with engine.using(engine_name) as engine_name:
+        timings = time_stages(article_xmls, crossref_configs, submission_types, repeat)
+        peak_memories = (
+            measure_memory(article_xmls, crossref_configs, submission_types) if memory else {})
+
+    parse_timings = timings.get('build_articles_for_crossref')
+    results = {
+        'version': elifecrossref.__version__,
+        'python': platform.python_version(),
+        'engine': engine_name,
+        'files': len(article_xmls),
+        'repeat': repeat,
+        'stages': {
+            'build_articles_for_crossref': summarise(parse_timings),
+        },
+    }
+    if memory:
+        results['stages']['build_articles_for_crossref']['peak_memory'] = (
+            peak_memories.get('build_articles_for_crossref'))
+    for submission_type in submission_types:
+        type_results = {}
+        for stage, stage_timings in timings.get(submission_type).items():
+            type_results[stage] = summarise(stage_timings)
+            if memory:
+                type_results[stage]['peak_memory'] = peak_memories.get(submission_type).get(stage)
+        # articles per second for all three stages, one article per file
+        total_seconds = sum(parse_timings) + sum(
+            sum(stage_timings) for stage_timings in timings.get(submission_type).values())
+        type_results['articles_per_second'] = (
+            len(parse_timings) / total_seconds if total_seconds else None)
+        results['stages'][submission_type] = type_results
+    return results
+
+
+def run_engine_benchmark(article_xmls, engine_names=None, submission_types=SUBMISSION_TYPES,
+                         repeat=1, config_file=None, registries_file=REGISTRIES_FILE,
+                         memory=True):
+    """run_benchmark with each XML engine, every installed engine by default"""
+    if not engine_names:
+        engine_names = engine.available_engines()
+    return {
+        'version': elifecrossref.__version__,
+        'python': platform.python_version(),
+        'engines': {
+            engine_name: run_benchmark(
+                article_xmls, submission_types, repeat, config_file, registries_file, memory,
+                engine_name)
+            for engine_name in engine_names},
+    }
+
+
+def reparse_inline_tag(tag_name, tag_string):
+    """the minidom path add_tag used for every inline tag before parse_inline_tag"""
+    parent = Element('root')
+    minidom_tag = xmlio.reparsed_tag(tag_name, tag_string, tags.REPARSING_NAMESPACES)
+    tags.append_tag(parent, minidom_tag)
+    return parent
+
+
+def parse_inline_tags(function, tag_string, number=INLINE_TAG_NUMBER):
+    for _ in range(number):
+        function('title', tag_string)
+
+
+def run_inline_tag_benchmark(tag_strings=INLINE_TAG_STRINGS, repeat=1,
+                             number=INLINE_TAG_NUMBER):
+    """
+    time parsing each tag string number times with parse_inline_tag
+    and with the xmlio.reparsed_tag and append_tag path it replaced
+    """
+    stages = [('parse_inline_tag', tags.parse_inline_tag),
+              ('reparsed_tag', reparse_inline_tag)]
+    timings = {stage: [] for stage, _ in stages}
+    for _ in range(repeat):
+        for tag_string in tag_strings:
+            for stage, function in stages:
+                timings[stage].append(timed(parse_inline_tags, function, tag_string, number)[1])
+    results = {
+        'version': elifecrossref.__version__,
+        'python': platform.python_version(),
+        'strings': len(tag_strings),
+        'number': number,
+        'repeat': repeat,
+        'stages': {},
+    }
+    for stage, stage_timings in timings.items():
+        stage_results = summarise(stage_timings)
+        total_seconds = sum(stage_timings)
+        stage_results['tags_per_second'] = (
+            number * len(stage_timings) / total_seconds if total_seconds else None)
+        results['stages'][stage] = stage_results
+    return results
+
+
+def scaling_point(crossref_config, dimension, size, submission_type='journal', repeat=1,
+                  memory=True):
+    """time build_crossref_xml for a synthetic article with size of the dimension part"""
+    article = synthetic.article(**{dimension: size})
+    timings = [
+        timed(generate.build_crossref_xml, [article], crossref_config, PUB_DATE, False,
+              submission_type)[1]
+        for _ in range(repeat)]
+    point = {'size': size, 'seconds': summarise(timings)}
+    if memory:
+        tracemalloc.start()
+        try:
+            point['peak_memory'] = peak_memory(
+                generate.build_crossref_xml, [article], crossref_config, PUB_DATE, False,
+                submission_type)
+        finally:
+            tracemalloc.stop()
+    return point
+
+
+def run_scaling_benchmark(dimensions=SCALING_DIMENSIONS, sizes=SCALING_SIZES, repeat=1,
+                          config_section='elife', config_file=None, submission_type='journal',
+                          memory=True):
+    """
+    time and memory of build_crossref_xml for synthetic articles of increasing size,
+    one series of points for each dimension, ready to plot size against seconds or memory
+    """
+    crossref_config = conf.cached_config(config_section, config_file)
+    return {
+        'version': elifecrossref.__version__,
+        'python': platform.python_version(),
+        'config_section': config_section,
+        'submission_type': submission_type,
+        'repeat': repeat,
+        'scaling': {
+            dimension: [
+                scaling_point(crossref_config, dimension, size, submission_type, repeat, memory)
+                for size in sizes]
+            for dimension in dimensions},
+    }
+
+
+def batch_articles(count=BATCH_SIZE):
+    return [synthetic.article(index=index, **BATCH_ARTICLE_PARTS)
+            for index in range(1, count + 1)]
+
+
+def build_batch_records(poa_articles, crossref_config, submission_type='journal'):
+    return [body.build_records(poa_article, crossref_config, PUB_DATE, submission_type)
+            for poa_article in poa_articles]
+
+
+def run_batch_benchmark(count=BATCH_SIZE, repeat=1, config_section='elife', config_file=None,
+                        submission_type='journal'):
+    """
+    time build_crossref_xml for a batch of synthetic articles, and the records of the batch
+    built from a config compiled once compared to a config compiled for each article
+    """
+    crossref_config = conf.cached_config(config_section, config_file)
+    generation_plan = plan.compiled(crossref_config)
+    articles = batch_articles(count)
+    stages = [
+        ('build_crossref_xml', generate.build_crossref_xml,
+         (articles, crossref_config, PUB_DATE, False, submission_type)),
+        ('records_compiled_once', build_batch_records,
+         (articles, generation_plan, submission_type)),
+        # a plain dict config is compiled again for every article
+        ('records_compiled_per_article', build_batch_records,
+         (articles, dict(crossref_config), submission_type)),
+    ]
+    results = {
+        'version': elifecrossref.__version__,
+        'python': platform.python_version(),
+        'config_section': config_section,
+        'submission_type': submission_type,
+        'repeat': repeat,
+        'articles': count,
+        'stages': {},
+    }
+    for stage, function, args in stages:
+        timings = [timed(function, *args)[1] for _ in range(repeat)]
+        stage_results = summarise(timings)
+        stage_results['articles_per_second'] = (
+            count / stage_results.get('mean') if stage_results.get('mean') else None)
+        results['stages'][stage] = stage_results
+    return results
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark Crossref XML generation over JATS XML files.')
+    parser.add_argument('--data-dir', default=DATA_DIR,
+                        help='directory of JATS XML files, default %(default)s')
+    parser.add_argument('--submission-type', action='append', choices=SUBMISSION_TYPES,
+                        help='submission type to benchmark, default is all of them')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of times to process every file, default %(default)s')
+    parser.add_argument('--config-file', default=None, help='crossref config file')
+    parser.add_argument('--registries-file', default=REGISTRIES_FILE,
+                        help='local clinical trials registries XML, default %(default)s')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='do not measure peak memory')
+    parser.add_argument('--engine', action='append', choices=engine.ENGINES,
+                        help='XML engine to benchmark, more than one compares them, '
+                             'default %s' % engine.DEFAULT_ENGINE)
+    parser.add_argument('--inline-tags', action='store_true',
+                        help='benchmark parsing inline markup instead of files')
+    parser.add_argument('--scaling', action='store_true',
+                        help='benchmark synthetic articles of increasing size instead of files')
+    parser.add_argument('--dimension', action='append', choices=SCALING_DIMENSIONS,
+                        help='article part to vary with --scaling, default is all of them')
+    parser.add_argument('--size', action='append', type=int,
+                        help='number of parts for --scaling, default %s' % (SCALING_SIZES,))
+    parser.add_argument('--batch', action='store_true',
+                        help='benchmark a batch of synthetic articles instead of files')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help='number of articles for --batch, default %(default)s')
+    parser.add_argument('--config-section', default='elife',
+                        help='config section for --scaling and --batch, default %(default)s')
+    parser.add_argument('--output', default=None,
+                        help='file to write the JSON results to, default is stdout')
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    options = parse_args(args)
+    if options.inline_tags:
+        results = run_inline_tag_benchmark(repeat=options.repeat)
+    elif options.scaling:
+        results = run_scaling_benchmark(
+            dimensions=options.dimension or SCALING_DIMENSIONS,
+            sizes=options.size or SCALING_SIZES,
+            repeat=options.repeat,
+            config_section=options.config_section,
+            config_file=options.config_file,
+            submission_type=(options.submission_type or ['journal'])[0],
+            memory=not options.no_memory)
+    elif options.batch:
+        results = run_batch_benchmark(
+            count=options.batch_size,
+            repeat=options.repeat,
+            config_section=options.config_section,
+            config_file=options.config_file,
+            submission_type=(options.submission_type or ['journal'])[0])
+    elif options.engine and len(options.engine) > 1:
+        results = run_engine_benchmark(
+            article_xml_files(options.data_dir),
+            engine_names=options.engine,
+            submission_types=options.submission_type or SUBMISSION_TYPES,
+            repeat=options.repeat,
+            config_file=options.config_file,
+            registries_file=options.registries_file,
+            memory=not options.no_memory)
+    else:
+        results = run_benchmark(
+            article_xml_files(options.data_dir),
+            submission_types=options.submission_type or SUBMISSION_TYPES,
+            repeat=options.repeat,
+            config_file=options.config_file,
+            registries_file=options.registries_file,
+            memory=not options.no_memory,
+            engine_name=(options.engine or [None])[0])
+    output = json.dumps(results, indent=4)
+    if options.output:
+        with open(options.output, 'w') as open_file:
+            open_file.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,89 @@
-from xml.etree.ElementTree import SubElement
-from elifecrossref import journal, peer_review
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from xml.etree.ElementTree import Element, SubElement
+from elifecrossref import engine, journal, peer_review, plan
 
 
-def set_body(parent, poa_articles, crossref_config, default_pub_date, submission_type):
+def set_body(parent, poa_articles, crossref_config, default_pub_date, submission_type,
+             workers=None, fragment_cache=None):
     body_tag = SubElement(parent, 'body')
 
+    if fragment_cache is not None:
+        # reuse records already built for an article, building only the others
+        body_tag.extend(fragment_cache.records(
+            poa_articles, crossref_config, default_pub_date, submission_type, workers))
+        return
+
+    if workers and workers > 1:
+        # build the records in separate processes and add them in the article order
+        for record_tags in build_records_parallel(
+                poa_articles, crossref_config, default_pub_date, submission_type, workers):
+            body_tag.extend(record_tags)
+        return
+
+    for poa_article in poa_articles:
+        set_record(body_tag, poa_article, crossref_config, default_pub_date, submission_type)
+
+
+def set_record(parent, poa_article, crossref_config, default_pub_date, submission_type):
+    if submission_type == 'journal':
+        # Create a new journal record for each article
+        journal.set_journal(parent, poa_article, crossref_config, default_pub_date)
+    elif submission_type == 'peer_review':
+        peer_review.set_peer_review(parent, poa_article, crossref_config)
+
+
+def build_records(poa_article, crossref_config, default_pub_date, submission_type,
+                  engine_name=None):
+    """
+    build the records for one article and return them as a list of tags,
+    with the engine_name XML engine, or the current engine if it is None
+    """
+    body_tag = Element('body')
+    with engine.using(engine_name or engine.current()):
+        set_record(body_tag, poa_article, plan.compiled(crossref_config), default_pub_date,
+                   submission_type)
+    return list(body_tag)
+
+
+def build_records_parallel(poa_articles, crossref_config, default_pub_date, submission_type,
+                           workers):
+    """build the records for each article in a process pool, returned in the article order"""
+    # the worker processes do not get the engine context variable, send them its value
+    build_function = partial(
+        build_records, crossref_config=crossref_config, default_pub_date=default_pub_date,
+        submission_type=submission_type, engine_name=engine.current())
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(build_function, poa_articles))
+
+
+def build_article_records(poa_article, crossref_config, default_pub_date, submission_types,
+                          engine_name=None):
+    """build the records of each submission type for one article, keyed on submission type"""
+    crossref_config = plan.compiled(crossref_config)
+    return {
+        submission_type: build_records(
+            poa_article, crossref_config, default_pub_date, submission_type, engine_name)
+        for submission_type in submission_types}
+
+
+def build_article_records_parallel(poa_articles, crossref_config, default_pub_date,
+                                   submission_types, workers):
+    """
+    build the records of every submission type in a process pool,
+    sending each article to a worker once, returned in the article order
+    """
+    build_function = partial(
+        build_article_records, crossref_config=crossref_config,
+        default_pub_date=default_pub_date, submission_types=submission_types,
+        engine_name=engine.current())
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(build_function, poa_articles))
+
+
+def body_records(poa_articles, crossref_config, default_pub_date, submission_type):
+    """build the records for one article at a time and yield each record tag"""
     for poa_article in poa_articles:
-        if submission_type == 'journal':
-            # Create a new journal record for each article
-            journal.set_journal(body_tag, poa_article, crossref_config, default_pub_date)
-        elif submission_type == 'peer_review':
-            peer_review.set_peer_review(body_tag, poa_article, crossref_config)
+        for record_tag in build_records(
+                poa_article, crossref_config, default_pub_date, submission_type):
+            yield record_tag
@@ -1,11 +1,13 @@
 from xml.etree.ElementTree import SubElement
-from elifecrossref import related, tags
+from elifecrossref import plan, related, shared, tags
 
 
 def set_citation_list(parent, poa_article, relations_program_tag, crossref_config):
     """
     Set the citation_list from the article object ref_list objects
     """
+    face_markup = plan.value(crossref_config, 'face_markup')
+    elocation_id_tag_name = plan.value(crossref_config, 'citation_elocation_id_tag_name')
     ref_index = 0
     if poa_article.ref_list:
         citation_list_tag = SubElement(parent, 'citation_list')
@@ -17,12 +19,13 @@ def set_citation_list(parent, poa_article, relations_program_tag, crossref_confi
             set_citation_related_item(relations_program_tag, ref)
 
         # continue with creating a citation tag
-        set_citation(citation_list_tag, ref, ref_index, crossref_config.get('face_markup'),
-                     crossref_config.get('crossref_schema_version'))
+        shared.add_subtree(
+            citation_list_tag,
+            ('citation', id(ref), ref_index, face_markup, elocation_id_tag_name),
+            set_citation, ref, ref_index, face_markup, elocation_id_tag_name)
 
 
-def set_citation(parent, ref, ref_index, face_markup,
-                 crossref_schema_version):
+def set_citation(parent, ref, ref_index, face_markup, elocation_id_tag_name):
     # continue with creating a citation tag
     citation_tag = SubElement(parent, 'citation')
     set_citation_key(citation_tag, ref, ref_index)
@@ -35,7 +38,7 @@ def set_citation(parent, ref, ref_index, face_markup,
     set_citation_article_title(citation_tag, ref)
     set_citation_doi(citation_tag, ref)
     set_citation_isbn(citation_tag, ref)
-    set_elocation_id(citation_tag, ref, crossref_schema_version)
+    set_elocation_id(citation_tag, ref, elocation_id_tag_name)
     # unstructured-citation
     if do_unstructured_citation(ref) is True:
         set_unstructured_citation(citation_tag, ref, face_markup)
@@ -118,16 +121,11 @@ def set_citation_isbn(parent, ref):
         isbn_tag.text = ref.isbn
 
 
-def set_elocation_id(parent, ref, crossref_schema_version):
+def set_elocation_id(parent, ref, elocation_id_tag_name):
+    # the tag name depends on the schema version, see plan.citation_elocation_id_tag_name
     if ref.elocation_id:
-        if crossref_schema_version in ['4.3.5', '4.3.7', '4.4.0']:
-            # Until alternate tag is available, elocation-id goes into first_page tag
-            first_page_tag = SubElement(parent, 'first_page')
-            first_page_tag.text = ref.elocation_id
-        else:
-            # schema greater than 4.4.0 supports elocation_id
-            elocation_id_tag = SubElement(parent, 'elocation_id')
-            elocation_id_tag.text = ref.elocation_id
+        elocation_id_tag = SubElement(parent, elocation_id_tag_name)
+        elocation_id_tag.text = ref.elocation_id
 
 
 def set_citation_related_item(parent, ref):
@@ -0,0 +1,265 @@
+"""
+command line generation of Crossref deposits from JATS XML files, for example
+
+    elifecrossref-generate 'articles/*.xml' --config-section elife --output-dir out --workers 4
+
+each chunk of files is parsed and written to one deposit file, in a pool of processes
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from xml.etree.ElementTree import ParseError
+from xml.parsers.expat import ExpatError
+from elifecrossref import clinical_trials, engine, generate, incremental
+from elifecrossref.instrument import summarise, timed
+from elifecrossref.conf import cached_config
+
+
+# errors reading, parsing or fetching the input which fail one chunk and not the whole run,
+# requests exceptions fetching the clinical trials registries are OSError too
+CHUNK_ERRORS = (OSError, ExpatError, ParseError, UnicodeError)
+
+# errors fetching or parsing the clinical trials registries
+REGISTRY_ERRORS = (OSError, ParseError)
+
+
+def article_xml_paths(paths):
+    """expand directories and glob patterns into a list of XML files, in order, without repeats"""
+    article_xmls = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = sorted(
+                os.path.join(path, file_name) for file_name in os.listdir(path)
+                if file_name.endswith('.xml'))
+        else:
+            matches = sorted(glob.glob(path))
+        for article_xml in matches:
+            if article_xml not in article_xmls:
+                article_xmls.append(article_xml)
+    return article_xmls
+
+
+def chunks(article_xmls, chunk_size=1):
+    return [article_xmls[index:index + chunk_size]
+            for index in range(0, len(article_xmls), chunk_size)]
+
+
+def prefetch_registries(crossref_config, submission_type='journal'):
+    """
+    start fetching the clinical trials registries in a background thread, returns a Future
+    or None if the deposits do not use them,
+    clinical trials are only in the crossmark data of journal deposits
+    """
+    registry_url = crossref_config.get('clinical_trials_registries')
+    if submission_type != 'journal' or not crossref_config.get('crossmark') or not registry_url:
+        return None
+    return clinical_trials.prefetch_registries(
+        registry_url, crossref_config.get('clinical_trials_registries_cache_file'),
+        crossref_config.get('clinical_trials_registries_cache_ttl',
+                            clinical_trials.REGISTRY_CACHE_TTL))
+
+
+def prefetched_registry_maps(registries_future, crossref_config):
+    """
+    the prefetched registry name to doi map keyed on its URL, to send to worker processes,
+    or None if there was no prefetch or it failed
+    """
+    if registries_future is None:
+        return None
+    try:
+        return {crossref_config.get('clinical_trials_registries'): registries_future.result()}
+    except REGISTRY_ERRORS as exception:
+        sys.stderr.write('could not fetch the clinical trials registries: %s\n' % exception)
+        return None
+
+
+def generate_chunk(article_xmls, output_dir, config_section=None, config_file=None,
+                   pub_date=None, add_comment=True, submission_type='journal', pretty=False,
+                   indent="", registry_maps=None, engine_name=None):
+    """
+    parse the files and write their deposit to the output_dir using the XML engine,
+    returns a dict of the file written, the timings and any error
+    """
+    result = {'files': article_xmls, 'articles': 0, 'file_name': None, 'error': None,
+              'parse_seconds': 0.0, 'generate_seconds': 0.0}
+    if registry_maps:
+        clinical_trials.preload_registry_maps(registry_maps)
+    try:
+        with engine.using(engine_name):
+            crossref_config = cached_config(config_section, config_file)
+            articles, result['parse_seconds'] = timed(
+                generate.build_articles_for_crossref, article_xmls,
+                submission_type=submission_type, crossref_config=crossref_config)
+            result['articles'] = len(articles)
+            if not articles:
+                result['error'] = 'no articles parsed'
+                return result
+            start = time.perf_counter()
+            c_xml = generate.build_crossref_xml(
+                articles, crossref_config, pub_date, add_comment, submission_type)
+            file_name = os.path.join(output_dir, c_xml.batch_id + '.xml')
+            with open(file_name, 'wb') as open_file:
+                open_file.write(c_xml.output_xml(pretty=pretty, indent=indent).encode('utf-8'))
+            result['generate_seconds'] = time.perf_counter() - start
+            result['file_name'] = file_name
+    except CHUNK_ERRORS as exception:
+        result['error'] = '%s: %s' % (exception.__class__.__name__, exception)
+    return result
+
+
+def generate_chunks(article_xml_chunks, output_dir, config_section=None, config_file=None,
+                    pub_date=None, add_comment=True, submission_type='journal', pretty=False,
+                    indent="", workers=None, registry_maps=None, engine_name=None):
+    """generate each chunk, in a pool of processes if workers is greater than 1"""
+    generate_function = partial(
+        generate_chunk, output_dir=output_dir, config_section=config_section,
+        config_file=config_file, pub_date=pub_date, add_comment=add_comment,
+        submission_type=submission_type, pretty=pretty, indent=indent,
+        registry_maps=registry_maps, engine_name=engine_name)
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(generate_function, article_xml_chunks))
+    return list(map(generate_function, article_xml_chunks))
+
+
+def changed_chunks(article_xml_chunks, manifest, crossref_config, submission_type, options,
+                   force=False):
+    """the chunks whose output is missing or out of date, with their input hashes"""
+    changed = []
+    for article_xmls in article_xml_chunks:
+        input_hash = incremental.content_hash(
+            article_xmls, crossref_config, submission_type, options)
+        if force or not incremental.cached_output(manifest, article_xmls, input_hash):
+            changed.append((article_xmls, input_hash))
+    return changed
+
+
+def throughput(results, seconds, skipped=0):
+    """totals and rates for the results of a run which took seconds"""
+    succeeded = [result for result in results if not result.get('error')]
+    articles = sum(result.get('articles') for result in succeeded)
+    return {
+        'files': sum(len(result.get('files')) for result in results),
+        'deposits': len(succeeded),
+        'failed': len(results) - len(succeeded),
+        'skipped': skipped,
+        'articles': articles,
+        'seconds': seconds,
+        'articles_per_second': articles / seconds if seconds else None,
+        'parse': summarise([result.get('parse_seconds') for result in succeeded]),
+        'generate': summarise([result.get('generate_seconds') for result in succeeded]),
+    }
+
+
+def format_throughput(stats):
+    lines = [
+        'files: %s' % stats.get('files'),
+        'deposits: %s' % stats.get('deposits'),
+        'failed: %s' % stats.get('failed'),
+        'skipped: %s' % stats.get('skipped', 0),
+        'articles: %s' % stats.get('articles'),
+        'seconds: %.3f' % stats.get('seconds'),
+    ]
+    if stats.get('articles_per_second') is not None:
+        lines.append('articles per second: %.2f' % stats.get('articles_per_second'))
+    for stage in ['parse', 'generate']:
+        stage_stats = stats.get(stage)
+        if stage_stats.get('count'):
+            lines.append('%s seconds per chunk: mean %.4f p50 %.4f p90 %.4f max %.4f' % (
+                stage, stage_stats.get('mean'), stage_stats.get('p50'),
+                stage_stats.get('p90'), stage_stats.get('max')))
+    return '\n'.join(lines)
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        description='Generate Crossref deposit XML from JATS XML files.')
+    parser.add_argument('paths', nargs='+',
+                        help='JATS XML files, directories or glob patterns')
+    parser.add_argument('--config-section', default=None,
+                        help='crossref config section, default is the DEFAULT section')
+    parser.add_argument('--config-file', default=None, help='crossref config file')
+    parser.add_argument('--submission-type', default='journal', choices=generate.SUBMISSION_TYPES,
+                        help='default %(default)s')
+    parser.add_argument('--output-dir', default=generate.TMP_DIR,
+                        help='directory to write the deposits to, default %(default)s')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of processes, default %(default)s')
+    parser.add_argument('--chunk-size', type=int, default=1,
+                        help='number of JATS files in each deposit, default %(default)s')
+    parser.add_argument('--pretty', action='store_true', help='indent the output with tabs')
+    parser.add_argument('--no-comment', action='store_true',
+                        help='do not add the generated comment')
+    parser.add_argument('--engine', default=engine.DEFAULT_ENGINE, choices=engine.ENGINES,
+                        help='XML engine for parsing inline markup, lxml must be installed, '
+                             'default %(default)s')
+    parser.add_argument('--incremental', action='store_true',
+                        help='skip files whose output in the manifest is up to date')
+    parser.add_argument('--force', action='store_true',
+                        help='with --incremental, generate every file and update the manifest')
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    options = parse_args(args)
+    if options.engine not in engine.available_engines():
+        sys.stderr.write('XML engine %s is not installed\n' % options.engine)
+        return 1
+    crossref_config = cached_config(options.config_section, options.config_file)
+    # fetch the registries while the files are found, hashed and parsed
+    registries_future = prefetch_registries(crossref_config, options.submission_type)
+    article_xmls = article_xml_paths(options.paths)
+    if not article_xmls:
+        sys.stderr.write('no XML files found\n')
+        return 1
+    if not os.path.isdir(options.output_dir):
+        os.makedirs(options.output_dir)
+    # one pub date for the whole run so every batch id uses the same time
+    pub_date = time.gmtime()
+    add_comment = not options.no_comment
+    indent = "\t" if options.pretty else ""
+    start = time.perf_counter()
+    article_xml_chunks = chunks(article_xmls, max(options.chunk_size, 1))
+    skipped = 0
+    if options.incremental:
+        manifest_file = incremental.manifest_path(options.output_dir)
+        manifest = incremental.load_manifest(manifest_file)
+        changed = changed_chunks(
+            article_xml_chunks, manifest, crossref_config, options.submission_type,
+            {'add_comment': add_comment, 'pretty': options.pretty, 'indent': indent},
+            options.force)
+        skipped = len(article_xml_chunks) - len(changed)
+        article_xml_chunks = [article_xmls for article_xmls, _ in changed]
+    registry_maps = None
+    if options.workers > 1 and article_xml_chunks:
+        # worker processes do not share the registry cache, send them the prefetched map
+        registry_maps = prefetched_registry_maps(registries_future, crossref_config)
+    # in this process, generating waits on the prefetch instead of fetching again
+    results = generate_chunks(
+        article_xml_chunks, options.output_dir, options.config_section, options.config_file,
+        pub_date, add_comment, options.submission_type, options.pretty, indent,
+        options.workers, registry_maps, options.engine)
+    if options.workers <= 1 and article_xml_chunks:
+        # report a failed prefetch as the workers do
+        prefetched_registry_maps(registries_future, crossref_config)
+    if options.incremental:
+        for (article_xmls, input_hash), result in zip(changed, results):
+            if result.get('file_name'):
+                incremental.record_output(
+                    manifest, article_xmls, input_hash, result.get('file_name'))
+        incremental.save_manifest(manifest, manifest_file)
+    stats = throughput(results, time.perf_counter() - start, skipped)
+    for result in results:
+        if result.get('error'):
+            sys.stderr.write('failed %s: %s\n' % (', '.join(result.get('files')),
+                                                 result.get('error')))
+    sys.stdout.write(format_throughput(stats) + '\n')
+    return 1 if stats.get('failed') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
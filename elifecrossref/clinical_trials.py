@@ -1,7 +1,14 @@
+import os
+import threading
+import time
 from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
 from xml.etree import ElementTree
 from xml.etree.ElementTree import SubElement
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 # to convert to Crossref type values they accept
@@ -13,6 +20,23 @@ CONTENT_TYPE_MAP = {
     'postResults': 'postResults',
 }
 
+# registry name to doi maps, keyed on the registry URL
+REGISTRY_CACHE = {}
+
+# default number of seconds a registries cache file is used before fetching again
+REGISTRY_CACHE_TTL = 86400
+
+# held while fetching so a prefetch and a generation thread do not both fetch the registry
+REGISTRY_LOCK = threading.Lock()
+
+# connect and read timeouts in seconds
+REGISTRY_TIMEOUT = (5, 30)
+
+# retries of failed connections and server errors, waiting longer after each one
+REGISTRY_RETRIES = 3
+REGISTRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
 
 def do_clinical_trials(poa_article):
     return bool(
@@ -33,17 +57,108 @@ def parse_registries_xml(registries_xml):
     return name_to_doi_map
 
 
-def registry_name_to_doi_map(registry_url):
-    """get XML for clinical trials registries and turn into a name to doi map"""
-    response = requests.get(registry_url)
-    return parse_registries_xml(response.content)
+def registry_name_to_doi_map(registry_url, cache_file=None, cache_ttl=REGISTRY_CACHE_TTL):
+    """
+    get XML for clinical trials registries and turn into a name to doi map,
+    the map is kept in memory and the XML is optionally kept in a cache_file
+    """
+    if registry_url not in REGISTRY_CACHE:
+        with REGISTRY_LOCK:
+            if registry_url not in REGISTRY_CACHE:
+                registries_xml = read_registries_cache_file(cache_file, cache_ttl)
+                if registries_xml is None:
+                    registries_xml = fetch_registries_xml(registry_url)
+                    write_registries_cache_file(cache_file, registries_xml)
+                REGISTRY_CACHE[registry_url] = parse_registries_xml(registries_xml)
+    return REGISTRY_CACHE.get(registry_url)
+
+
+@lru_cache(maxsize=None)
+def registry_session(retries=REGISTRY_RETRIES, backoff_factor=REGISTRY_BACKOFF_FACTOR):
+    """requests Session, one per process, which pools connections and retries failures"""
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=backoff_factor,
+                  status_forcelist=RETRY_STATUS_CODES)
+    adapter = HTTPAdapter(max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_registries_xml(registry_url, timeout=REGISTRY_TIMEOUT, retries=REGISTRY_RETRIES,
+                         backoff_factor=REGISTRY_BACKOFF_FACTOR):
+    """GET the registries XML, raises a requests exception if it cannot be fetched"""
+    response = registry_session(retries, backoff_factor).get(registry_url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+def prefetch_registries(registry_url, cache_file=None, cache_ttl=REGISTRY_CACHE_TTL):
+    """
+    get the registry name to doi map in a background thread, e.g. while articles are parsed,
+    returns a Future whose result is the map, or the exception if it could not be fetched
+    """
+    future = Future()
+
+    def fetch():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(registry_name_to_doi_map(registry_url, cache_file, cache_ttl))
+        except BaseException as exception:
+            # raised to whoever waits on the result, as an executor would
+            future.set_exception(exception)
+
+    # a daemon thread so an unreachable registry does not keep the process from exiting
+    threading.Thread(target=fetch, daemon=True).start()
+    return future
+
+
+def read_registries_cache_file(cache_file, cache_ttl=REGISTRY_CACHE_TTL):
+    """registries XML from the cache_file if it exists and is not older than cache_ttl seconds"""
+    if not cache_file or not os.path.exists(cache_file):
+        return None
+    if cache_ttl is not None and time.time() - os.path.getmtime(cache_file) > cache_ttl:
+        return None
+    with open(cache_file, 'rb') as open_file:
+        return open_file.read()
+
+
+def write_registries_cache_file(cache_file, registries_xml):
+    if cache_file and registries_xml:
+        if isinstance(registries_xml, str):
+            registries_xml = registries_xml.encode('utf-8')
+        # write to a temporary file in the same directory first so another process
+        # reading the cache file never gets part of it
+        temp_file = cache_file + '.%s.tmp' % os.getpid()
+        with open(temp_file, 'wb') as open_file:
+            open_file.write(registries_xml)
+        os.replace(temp_file, cache_file)
+
+
+def preload_registries(registry_url, registries_xml):
+    """use registries XML, e.g. from a local file, for the registry_url instead of fetching it"""
+    REGISTRY_CACHE[registry_url] = parse_registries_xml(registries_xml)
+
+
+def preload_registry_maps(registry_maps):
+    """use name to doi maps keyed on registry URL, e.g. fetched by another process"""
+    REGISTRY_CACHE.update(registry_maps)
+
+
+def clear_registry_cache():
+    REGISTRY_CACHE.clear()
 
 
 def set_clinical_trials(parent, poa_article, crossref_config):
     if do_clinical_trials(poa_article):
         # get a map of name to registry DOI
         name_to_doi_map = (
-            registry_name_to_doi_map(crossref_config.get('clinical_trials_registries')) if
+            registry_name_to_doi_map(
+                crossref_config.get('clinical_trials_registries'),
+                crossref_config.get('clinical_trials_registries_cache_file'),
+                crossref_config.get(
+                    'clinical_trials_registries_cache_ttl', REGISTRY_CACHE_TTL)) if
             crossref_config.get('clinical_trials_registries') else None)
         ai_program_tag = set_ct_program(parent)
         for clinical_trial in poa_article.clinical_trials:
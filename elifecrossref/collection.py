@@ -1,5 +1,5 @@
 from xml.etree.ElementTree import SubElement
-from elifecrossref import access_indicators, resource_url
+from elifecrossref import access_indicators, plan, resource_url
 
 
 def set_collection(parent, poa_article, collection_property, crossref_config):
@@ -23,16 +23,12 @@ def set_collection(parent, poa_article, collection_property, crossref_config):
 
 def do_set_collection_text_mining_xml(crossref_config):
     """decide whether to text mining xml resource"""
-    if (crossref_config.get("text_mining_xml_pattern")
-            and crossref_config.get("text_mining_pdf_pattern") != ''):
-        return True
-    return False
+    return plan.value(crossref_config, 'text_mining_xml')
 
 
 def do_set_collection_text_mining_pdf(poa_article, crossref_config):
     """decide whether to text mining pdf resource"""
-    if (crossref_config.get("text_mining_pdf_pattern")
-            and crossref_config.get("text_mining_pdf_pattern") != ''
+    if (plan.value(crossref_config, 'text_mining_pdf')
             and poa_article.get_self_uri("pdf") is not None):
         return True
     return False
@@ -1,5 +1,5 @@
 from xml.etree.ElementTree import SubElement
-from elifecrossref import mime_type, resource_url, tags
+from elifecrossref import mime_type, plan, resource_url, tags
 
 
 def set_component_list(parent, poa_article, crossref_config):
@@ -11,8 +11,9 @@ def set_component_list(parent, poa_article, crossref_config):
 
     component_list_tag = SubElement(parent, 'component_list')
     # ignore excluded components based on the configuration settings
+    exclude_types = plan.value(crossref_config, 'component_exclude_types')
     component_list = [comp for comp in poa_article.component_list
-                      if comp.type not in crossref_config.get('component_exclude_types', [])]
+                      if comp.type not in exclude_types]
     for comp in component_list:
         set_component(component_list_tag, poa_article, comp, crossref_config)
 
@@ -32,7 +33,7 @@ def set_component_titles(parent, comp, crossref_config):
     title_tag = SubElement(titles_tag, 'title')
     title_tag.text = comp.title
     if comp.subtitle:
-        set_subtitle(titles_tag, comp, crossref_config.get('face_markup'))
+        set_subtitle(titles_tag, comp, plan.value(crossref_config, 'face_markup'))
 
 
 def set_component_mime_type(parent, comp):
@@ -45,7 +46,7 @@ def set_component_mime_type(parent, comp):
 
 def set_component_permissions(parent, comp, crossref_config):
     """Specific license for the component"""
-    license_href = crossref_config.get('component_license_ref')
+    license_href = plan.value(crossref_config, 'component_license_ref')
     # First check if a license should be added
     if not license_href or not comp.permissions:
         return
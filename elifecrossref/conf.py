@@ -1,8 +1,26 @@
 import configparser as configparser
 import json
+import os
 
 CONFIG_FILE = 'crossref.cfg'
 
+# (config file modified time, parsed config) keyed on (config file path, config section)
+CONFIG_CACHE = {}
+
+
+class FrozenDict(dict):
+    """read only dict, returned by the config cache so it cannot be changed by a caller"""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('%s is read only, copy it with dict() to change values' %
+                        self.__class__.__name__)
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
 
 def load_config(config_file=None):
     if not config_file:
@@ -36,6 +54,9 @@ def parse_raw_config(raw_config_object):
     boolean_values.append("elocation_id")
     boolean_values.append("elife_style_component_doi")
     int_values.append("year_of_first_volume")
+    int_values.append("clinical_trials_registries_cache_ttl")
+    int_values.append("batch_max_articles")
+    int_values.append("batch_max_bytes")
     list_values.append("contrib_types")
     list_values.append("archive_locations")
     list_values.append("access_indicators_applies_to")
@@ -54,3 +75,45 @@ def parse_raw_config(raw_config_object):
             # default
             crossref_config[value_name] = raw_config_object.get(value_name)
     return crossref_config
+
+
+def freeze(value):
+    """convert lists and dicts in a parsed config value to read only types"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def config_cache_key(config_section, config_file=None):
+    if not config_file:
+        config_file = CONFIG_FILE
+    return os.path.abspath(config_file), config_section
+
+
+def modified_time(config_path):
+    try:
+        return os.stat(config_path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def cached_config(config_section, config_file=None):
+    """
+    load and parse the config section once, then return the same read only parsed
+    config until the config file is modified or the cache is cleared,
+    a modified config file replaces the cached config parsed from it
+    """
+    key = config_cache_key(config_section, config_file)
+    config_modified_time = modified_time(key[0])
+    cached = CONFIG_CACHE.get(key)
+    if cached is None or cached[0] != config_modified_time:
+        cached = (config_modified_time,
+                  freeze(parse_raw_config(raw_config(config_section, config_file))))
+        CONFIG_CACHE[key] = cached
+    return cached[1]
+
+
+def clear_config_cache():
+    CONFIG_CACHE.clear()
@@ -1,4 +1,5 @@
 from xml.etree.ElementTree import SubElement
+from elifecrossref import shared
 
 
 def set_article_contributors(parent, poa_article, contrib_types=None):
@@ -16,6 +17,12 @@ def set_article_contributors(parent, poa_article, contrib_types=None):
 
 
 def set_contributors(parent, contributors):
+    shared.add_subtree(
+        parent, ('contributors',) + tuple(id(contributor) for contributor in contributors),
+        build_contributors, contributors)
+
+
+def build_contributors(parent, contributors):
     # If contrib_type is None, all contributors will be added regardless of their type
     contributors_tag = SubElement(parent, "contributors")
 
@@ -1,5 +1,5 @@
-from xml.etree.ElementTree import SubElement
-from elifecrossref import access_indicators, clinical_trials, dates, funding
+from xml.etree.ElementTree import Element, SubElement
+from elifecrossref import access_indicators, clinical_trials, dates, funding, plan
 
 
 # article types currently supported for depositing simple updates via Crossmark
@@ -9,8 +9,8 @@ UPDATES_ARTICLE_TYPES = ['correction', 'retraction']
 def do_crossmark(poa_article, crossref_config):
     """check if there are sufficient and correct values to set crossmark data"""
     return bool(
-        crossref_config.get("crossmark") and (
-            crossref_config.get('crossmark_policy') or (
+        plan.value(crossref_config, 'crossmark') and (
+            plan.value(crossref_config, 'crossmark_policy') or (
                 hasattr(poa_article, 'doi') and poa_article.doi)
             )
         )
@@ -20,24 +20,22 @@ def set_crossmark(parent, poa_article, crossref_config):
     crossmark = SubElement(parent, 'crossmark')
 
     crossmark_policy = SubElement(crossmark, 'crossmark_policy')
-    if crossref_config.get('crossmark_policy'):
-        crossmark_policy.text = crossref_config.get('crossmark_policy')
+    if plan.value(crossref_config, 'crossmark_policy'):
+        crossmark_policy.text = plan.value(crossref_config, 'crossmark_policy')
     else:
         crossmark_policy.text = poa_article.doi
 
-    if crossref_config.get('crossmark_domains'):
-        crossmark_domains = SubElement(crossmark, 'crossmark_domains')
-        for domain in crossref_config.get('crossmark_domains'):
-            crossmark_domain = SubElement(crossmark_domains, 'crossmark_domain')
-            crossmark_domain_domain = SubElement(crossmark_domain, 'domain')
-            crossmark_domain_domain.text = domain.get('domain')
-            if domain.get('filter'):
-                crossmark_domain_filter = SubElement(crossmark_domain, 'filter')
-                crossmark_domain_filter.text = domain.get('filter')
+    # the domains are the same for every article, built once for the config
+    crossmark_domains = plan.value(crossref_config, 'crossmark_domains')
+    if crossmark_domains:
+        crossmark.append(plan.template(
+            crossref_config, ('crossmark_domains',), crossmark_domains_tag, crossmark_domains))
 
-    if crossref_config.get('crossmark_domain_exclusive'):
-        crossmark_domain_exclusive = SubElement(crossmark, 'crossmark_domain_exclusive')
-        crossmark_domain_exclusive.text = crossref_config.get('crossmark_domain_exclusive')
+    crossmark_domain_exclusive = plan.value(crossref_config, 'crossmark_domain_exclusive')
+    if crossmark_domain_exclusive:
+        crossmark.append(plan.template(
+            crossref_config, ('crossmark_domain_exclusive',), crossmark_domain_exclusive_tag,
+            crossmark_domain_exclusive))
 
     if do_updates(poa_article):
         set_updates(crossmark, poa_article, crossref_config)
@@ -45,6 +43,24 @@ def set_crossmark(parent, poa_article, crossref_config):
     set_custom_metadata(crossmark, poa_article, crossref_config)
 
 
+def crossmark_domains_tag(domains):
+    crossmark_domains = Element('crossmark_domains')
+    for domain in domains:
+        crossmark_domain = SubElement(crossmark_domains, 'crossmark_domain')
+        crossmark_domain_domain = SubElement(crossmark_domain, 'domain')
+        crossmark_domain_domain.text = domain.get('domain')
+        if domain.get('filter'):
+            crossmark_domain_filter = SubElement(crossmark_domain, 'filter')
+            crossmark_domain_filter.text = domain.get('filter')
+    return crossmark_domains
+
+
+def crossmark_domain_exclusive_tag(domain_exclusive):
+    crossmark_domain_exclusive = Element('crossmark_domain_exclusive')
+    crossmark_domain_exclusive.text = domain_exclusive
+    return crossmark_domain_exclusive
+
+
 def do_custom_metadata(poa_article, crossref_config):
     return bool(
         access_indicators.do_access_indicators(poa_article, crossref_config)
@@ -1,5 +1,6 @@
 import time
 from xml.etree.ElementTree import SubElement
+from elifecrossref import shared
 
 
 def get_pub_date(poa_article, crossref_config, default_pub_date):
@@ -24,6 +25,12 @@ def get_pub_date(poa_article, crossref_config, default_pub_date):
 
 def set_publication_date(parent, pub_date):
     # pub_date is a python time object
+    if pub_date:
+        shared.add_subtree(
+            parent, ('publication_date', tuple(pub_date)), build_publication_date, pub_date)
+
+
+def build_publication_date(parent, pub_date):
     if pub_date:
         publication_date_tag = SubElement(parent, 'publication_date')
         publication_date_tag.set("media_type", "online")
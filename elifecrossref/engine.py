@@ -0,0 +1,51 @@
+"""
+the XML engine used to parse inline markup, the standard library expat parser by default,
+or lxml if it is installed, for example
+
+    with engine.using('lxml'):
+        generate.build_crossref_xml(articles, crossref_config)
+
+both engines build the same ElementTree tags, so the output is the same,
+context variables do not reach worker processes so the body builders send the engine to them
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+
+ENGINES = ('stdlib', 'lxml')
+
+DEFAULT_ENGINE = 'stdlib'
+
+ENGINE = ContextVar('elifecrossref_engine', default=DEFAULT_ENGINE)
+
+
+def available_engines():
+    return tuple(
+        engine_name for engine_name in ENGINES
+        if engine_name != 'lxml' or lxml_etree is not None)
+
+
+def current():
+    return ENGINE.get()
+
+
+@contextmanager
+def using(engine_name=None):
+    """use the engine in the with block, the default engine if engine_name is None"""
+    if engine_name is None:
+        engine_name = DEFAULT_ENGINE
+    if engine_name not in ENGINES:
+        raise ValueError('unknown XML engine %s, use one of %s' % (engine_name, ENGINES))
+    if engine_name not in available_engines():
+        raise ValueError('XML engine %s is not installed' % engine_name)
+    token = ENGINE.set(engine_name)
+    try:
+        yield engine_name
+    finally:
+        ENGINE.reset(token)
+
@@ -0,0 +1,103 @@
+"""
+cache of the body records built for each article, so the same article can be added to another
+deposit without building its journal or peer_review tags again, for example
+
+    fragment_cache = fragments.FragmentCache()
+    generate.build_crossref_xml(articles, crossref_config, fragment_cache=fragment_cache)
+
+records are keyed on the article DOI and version, the config, the submission type
+and the pub date of the article, a changed article must have a new version
+or the cache must be cleared
+"""
+import hashlib
+import json
+import os
+import pickle
+from elifecrossref import body, dates
+
+
+def config_fingerprint(crossref_config):
+    return hashlib.sha256(
+        json.dumps(crossref_config, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def fragment_key(poa_article, fingerprint, crossref_config, default_pub_date, submission_type):
+    pub_date = None
+    if submission_type == 'journal':
+        # the default pub date is only used if the article has no pub date of its own
+        pub_date = dates.iso_date_string(
+            dates.get_pub_date(poa_article, crossref_config, default_pub_date))
+    return hashlib.sha256(json.dumps(
+        [poa_article.doi, poa_article.version, fingerprint, submission_type, pub_date],
+        default=str).encode('utf-8')).hexdigest()
+
+
+class FragmentCache(object):
+    """
+    pickled record tags keyed on fragment_key, kept in memory and,
+    if cache_dir is set, in files in that directory,
+    only use a cache_dir whose files you trust, they are unpickled when read
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.fragments = {}
+        self.hits = 0
+        self.misses = 0
+
+    def file_name(self, key):
+        return os.path.join(self.cache_dir, key + '.pickle')
+
+    def get(self, key):
+        """a new copy of the record tags for the key, or None if they are not cached"""
+        fragment = self.fragments.get(key)
+        if fragment is None and self.cache_dir and os.path.exists(self.file_name(key)):
+            with open(self.file_name(key), 'rb') as open_file:
+                fragment = open_file.read()
+            self.fragments[key] = fragment
+        if fragment is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(fragment)
+
+    def set(self, key, record_tags):
+        fragment = pickle.dumps(record_tags, protocol=pickle.HIGHEST_PROTOCOL)
+        self.fragments[key] = fragment
+        if self.cache_dir:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            with open(self.file_name(key), 'wb') as open_file:
+                open_file.write(fragment)
+
+    def clear(self):
+        """empty the memory cache, files in the cache_dir are not removed"""
+        self.fragments = {}
+
+    def records(self, poa_articles, crossref_config, default_pub_date, submission_type,
+                workers=None):
+        """
+        the record tags for the articles, in the article order, from the cache
+        or built and added to the cache, in a pool of processes if workers is greater than 1
+        """
+        fingerprint = config_fingerprint(crossref_config)
+        keys = [
+            fragment_key(poa_article, fingerprint, crossref_config, default_pub_date,
+                         submission_type)
+            for poa_article in poa_articles]
+        article_records = [self.get(key) for key in keys]
+        missing = [index for index, record_tags in enumerate(article_records)
+                   if record_tags is None]
+        missing_articles = [poa_articles[index] for index in missing]
+        if workers and workers > 1:
+            built_records = body.build_records_parallel(
+                missing_articles, crossref_config, default_pub_date, submission_type, workers)
+        else:
+            built_records = [
+                body.build_records(poa_article, crossref_config, default_pub_date,
+                                   submission_type)
+                for poa_article in missing_articles]
+        for index, record_tags in zip(missing, built_records):
+            self.set(keys[index], record_tags)
+            article_records[index] = record_tags
+        return [record_tag for record_tags in article_records for record_tag in record_tags]
@@ -1,4 +1,5 @@
 from xml.etree.ElementTree import SubElement
+from elifecrossref import shared
 
 
 def do_funding(poa_article):
@@ -9,6 +10,10 @@ def set_fundref(parent, poa_article):
     """
     Set the fundref data from the article funding_awards list
     """
+    shared.add_subtree(parent, ('fundref', id(poa_article)), build_fundref, poa_article)
+
+
+def build_fundref(parent, poa_article):
     if do_funding(poa_article):
         fr_program_tag = SubElement(parent, 'fr:program')
         fr_program_tag.set("name", "fundref")
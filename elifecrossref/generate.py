@@ -1,32 +1,60 @@
+import itertools
 import time
 import os
-from xml.etree import ElementTree
-from xml.etree.ElementTree import Element, Comment
-from xml.dom import minidom
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from collections import OrderedDict
+from xml.etree.ElementTree import Element, Comment, SubElement
 
 from elifearticle import utils as eautils
 from elifearticle import parse
 
-from elifecrossref import body, head, utils
+from elifecrossref import body, head, plan, serialize, shared, utils
 
-from elifecrossref.conf import raw_config, parse_raw_config
+from elifecrossref.conf import cached_config
 
 
 TMP_DIR = 'tmp'
 
+# environment variable which, when set, overrides the version in the generated comment
+VERSION_ENV_VARIABLE = 'ELIFECROSSREF_GENERATOR_VERSION'
+
+SUBMISSION_TYPES = ('journal', 'peer_review')
+
+# article parts to parse for generating journal and peer_review deposits
+CROSSREF_BUILD_PARTS = [
+    'abstract', 'basic', 'components', 'contributors', 'funding', 'datasets',
+    'license', 'pub_dates', 'references', 'related_articles', 'volume', 'sub_articles']
+
+JOURNAL_BUILD_PARTS = [
+    'abstract', 'basic', 'components', 'contributors', 'funding', 'datasets',
+    'license', 'pub_dates', 'references', 'related_articles', 'volume']
+
+# review articles are parsed from the sub-articles, with their own contributors, dates,
+# license and related articles, the parent article only adds its title and DOI details
+PEER_REVIEW_BUILD_PARTS = [
+    'basic', 'contributors', 'license', 'pub_dates', 'related_articles', 'sub_articles']
+
 
 class CrossrefXML(object):
 
     def __init__(self, poa_articles, crossref_config, pub_date=None, add_comment=True,
-                 submission_type='journal'):
+                 submission_type='journal', workers=None, batch_number=None,
+                 fragment_cache=None):
         """
         Set the root node
         set default values for dates and batch id
-        then build out the XML using the article objects
+        then build out the XML using the article objects,
+        in a pool of processes if workers is greater than 1,
+        reusing records from the fragment_cache if one is supplied
         """
-        # Create the root XML node
-        self.root = Element('doi_batch')
-        set_root(self.root, crossref_config.get('crossref_schema_version'))
+        self.workers = workers
+        self.fragment_cache = fragment_cache
+        # resolve the config decisions once for all the articles
+        crossref_config = plan.compiled(crossref_config)
+
+        # Create the root XML node, with the namespaces and schema details of the plan
+        self.root = Element('doi_batch', crossref_config.root_attrib)
 
         # Publication date
         if pub_date is None:
@@ -35,33 +63,108 @@ class CrossrefXML(object):
             self.pub_date = pub_date
 
         self.batch_id = get_batch_id(
-            crossref_config.get('batch_file_prefix'), self.pub_date, poa_articles, submission_type)
+            crossref_config.get('batch_file_prefix'), self.pub_date, poa_articles, submission_type,
+            batch_number)
 
         # set comment
         if add_comment:
-            self.generated = time.strftime("%Y-%m-%d %H:%M:%S")
-            last_commit = eautils.get_last_commit_to_master()
-            comment = Comment('generated by ' + str(crossref_config.get('generator')) +
-                              ' at ' + self.generated +
-                              ' from version ' + last_commit)
-            self.root.append(comment)
+            self.set_comment(crossref_config)
 
         # Build out the Crossref XML
         self.build(poa_articles, crossref_config, submission_type)
 
+    def set_comment(self, crossref_config):
+        self.generated = time.strftime("%Y-%m-%d %H:%M:%S")
+        version = crossref_config.get('generator_version') or generator_version()
+        comment = Comment('generated by ' + str(crossref_config.get('generator')) +
+                          ' at ' + self.generated +
+                          ' from version ' + version)
+        self.root.append(comment)
+
     def build(self, poa_articles, crossref_config, submission_type):
         head.set_head(self.root, self.batch_id, self.pub_date, crossref_config)
-        body.set_body(self.root, poa_articles, crossref_config, self.pub_date, submission_type)
+        body.set_body(self.root, poa_articles, crossref_config, self.pub_date, submission_type,
+                      self.workers, self.fragment_cache)
 
     def output_xml(self, pretty=False, indent=""):
-        encoding = 'utf-8'
+        return serialize.tostring(self.root, pretty=pretty, indent=indent)
 
-        rough_string = ElementTree.tostring(self.root, encoding)
-        reparsed = minidom.parseString(rough_string)
 
-        if pretty is True:
-            return reparsed.toprettyxml(indent, encoding=encoding).decode(encoding)
-        return reparsed.toxml(encoding=encoding).decode(encoding)
+class CrossrefXMLRecords(CrossrefXML):
+    """Crossref XML with a body of records which were already built"""
+
+    def __init__(self, poa_articles, record_tags, crossref_config, pub_date=None,
+                 add_comment=True, submission_type='journal', batch_number=None):
+        self.record_tags = record_tags
+        super().__init__(poa_articles, crossref_config, pub_date, add_comment, submission_type,
+                         batch_number=batch_number)
+
+    def build(self, poa_articles, crossref_config, submission_type):
+        head.set_head(self.root, self.batch_id, self.pub_date, crossref_config)
+        body_tag = SubElement(self.root, 'body')
+        body_tag.extend(self.record_tags)
+
+
+class CrossrefXMLStream(CrossrefXML):
+    """
+    Crossref XML which builds and writes one body record at a time,
+    poa_articles can be any iterable and is consumed when the output is written
+    """
+
+    def __init__(self, poa_articles, crossref_config, pub_date=None, add_comment=True,
+                 submission_type='journal'):
+        # only the first article is needed up front, to set the batch id
+        poa_articles = iter(poa_articles)
+        first_articles = list(itertools.islice(poa_articles, 1))
+        super().__init__(first_articles, crossref_config, pub_date, add_comment, submission_type)
+        self.poa_articles = itertools.chain(first_articles, poa_articles)
+
+    def build(self, poa_articles, crossref_config, submission_type):
+        # the body records are built later, in write_xml
+        head.set_head(self.root, self.batch_id, self.pub_date, crossref_config)
+        self.crossref_config = crossref_config
+        self.submission_type = submission_type
+
+    def write_xml(self, write, pretty=False, indent=""):
+        """write the XML using the write callable, dropping each record once it is written"""
+        addindent, newl = serialize.whitespace(pretty, indent)
+        write(serialize.xml_declaration() + newl)
+        serialize.write_start_tag(write, self.root, '', newl)
+        for tag in self.root:
+            serialize.write_node(write, tag, addindent, addindent, newl)
+        body_tag = Element('body')
+        has_records = False
+        for record_tag in body.body_records(
+                self.poa_articles, self.crossref_config, self.pub_date, self.submission_type):
+            if not has_records:
+                serialize.write_start_tag(write, body_tag, addindent, newl)
+                has_records = True
+            serialize.write_node(write, record_tag, addindent * 2, addindent, newl)
+        if has_records:
+            serialize.write_end_tag(write, body_tag, addindent, newl)
+        else:
+            serialize.write_node(write, body_tag, addindent, addindent, newl)
+        serialize.write_end_tag(write, self.root, '', newl)
+
+    def write(self, open_file, pretty=False, indent=""):
+        """write the XML to a file-like object opened in binary mode"""
+        def write_encoded(string):
+            open_file.write(string.encode(serialize.ENCODING))
+        self.write_xml(write_encoded, pretty=pretty, indent=indent)
+
+    def output_xml(self, pretty=False, indent=""):
+        parts = []
+        self.write_xml(parts.append, pretty=pretty, indent=indent)
+        return ''.join(parts)
+
+
+@lru_cache(maxsize=None)
+def generator_version():
+    """
+    version value for the generated comment, from the environment variable if set
+    otherwise the last git commit, resolved once per process
+    """
+    return os.environ.get(VERSION_ENV_VARIABLE) or eautils.get_last_commit_to_master()
 
 
 def set_root(root, schema_version):
@@ -70,23 +173,15 @@ def set_root(root, schema_version):
     :param root: ElementTree.Element tag
     :param schema_version: version of the Crossref schema as a string, e.g. 4.4.1
     """
-    root.set('version', schema_version)
-    root.set('xmlns', 'http://www.crossref.org/schema/%s' % schema_version)
-    root.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-    root.set('xmlns:fr', 'http://www.crossref.org/fundref.xsd')
-    root.set('xmlns:ai', 'http://www.crossref.org/AccessIndicators.xsd')
-    if schema_version != "4.3.5":
-        root.set('xmlns:ct', 'http://www.crossref.org/clinicaltrials.xsd')
-        root.set('xmlns:rel', 'http://www.crossref.org/relations.xsd')
-    schema_location_name = 'http://www.crossref.org/schema/%s' % schema_version
-    schema_location_uri = 'http://www.crossref.org/schemas/crossref%s.xsd' % schema_version
-    root.set('xsi:schemaLocation', '%s %s' % (schema_location_name, schema_location_uri))
-    root.set('xmlns:mml', 'http://www.w3.org/1998/Math/MathML')
-    root.set('xmlns:jats', 'http://www.ncbi.nlm.nih.gov/JATS1')
-
-
-def get_batch_id(batch_file_prefix, pub_date, poa_articles, submission_type):
-    """generate a doi_batch_id value for the Crossref deposit"""
+    for name, value in plan.root_attributes(schema_version):
+        root.set(name, value)
+
+
+def get_batch_id(batch_file_prefix, pub_date, poa_articles, submission_type, batch_number=None):
+    """
+    generate a doi_batch_id value for the Crossref deposit,
+    batch_number is added when the articles are split into more than one deposit
+    """
     batch_id_parts = []
     # add detail about submission type
     if submission_type != 'journal':
@@ -97,52 +192,188 @@ def get_batch_id(batch_file_prefix, pub_date, poa_articles, submission_type):
         batch_id_parts.append(str(utils.clean_string(poa_articles[0].manuscript)))
     # add detail about the date
     batch_id_parts.append(time.strftime("%Y%m%d%H%M%S", pub_date))
+    if batch_number is not None:
+        batch_id_parts.append(str(batch_number))
     # concatenate and return the final batch id
     return str(batch_file_prefix) + '-'.join([part for part in batch_id_parts if part])
 
 
 def build_crossref_xml(poa_articles, crossref_config=None, pub_date=None, add_comment=True,
-                       submission_type='journal'):
+                       submission_type='journal', workers=None, fragment_cache=None):
     """
     Given a list of article article objects
     generate crossref XML from them
     """
     if not crossref_config:
-        crossref_config = parse_raw_config(raw_config(None))
-    return CrossrefXML(poa_articles, crossref_config, pub_date, add_comment, submission_type)
+        crossref_config = cached_config(None)
+    return CrossrefXML(poa_articles, crossref_config, pub_date, add_comment, submission_type,
+                       workers, fragment_cache=fragment_cache)
 
 
 def crossref_xml(poa_articles, crossref_config=None, pub_date=None, add_comment=True,
-                 submission_type='journal', pretty=False, indent=""):
+                 submission_type='journal', pretty=False, indent="", workers=None,
+                 fragment_cache=None):
     """build crossref xml and return output as a string"""
     if not crossref_config:
-        crossref_config = parse_raw_config(raw_config(None))
+        crossref_config = cached_config(None)
     c_xml = build_crossref_xml(poa_articles, crossref_config, pub_date, add_comment,
-                               submission_type)
+                               submission_type, workers, fragment_cache)
     return c_xml.output_xml(pretty=pretty, indent=indent)
 
 
+def build_crossref_xmls(poa_articles, crossref_config=None, pub_date=None, add_comment=True,
+                        submission_types=SUBMISSION_TYPES, workers=None):
+    """
+    build the deposit for each submission type in one pass over the articles,
+    in a pool of processes if workers is greater than 1,
+    returns the CrossrefXML objects keyed on submission type
+    """
+    if not crossref_config:
+        crossref_config = cached_config(None)
+    crossref_config = plan.compiled(crossref_config)
+    # one pub date so the deposits have matching batch ids and timestamps
+    if pub_date is None:
+        pub_date = time.gmtime()
+    if workers and workers > 1:
+        article_records = body.build_article_records_parallel(
+            poa_articles, crossref_config, pub_date, submission_types, workers)
+    else:
+        article_records = [
+            body.build_article_records(poa_article, crossref_config, pub_date, submission_types)
+            for poa_article in poa_articles]
+    return OrderedDict(
+        (submission_type, CrossrefXMLRecords(
+            poa_articles,
+            [record_tag for records in article_records
+             for record_tag in records.get(submission_type)],
+            crossref_config, pub_date, add_comment, submission_type))
+        for submission_type in submission_types)
+
+
+def crossref_xmls(poa_articles, crossref_config=None, pub_date=None, add_comment=True,
+                  submission_types=SUBMISSION_TYPES, pretty=False, indent="", workers=None):
+    """build the deposit for each submission type and return the output keyed on type"""
+    return OrderedDict(
+        (submission_type, c_xml.output_xml(pretty=pretty, indent=indent))
+        for submission_type, c_xml in build_crossref_xmls(
+            poa_articles, crossref_config, pub_date, add_comment, submission_types,
+            workers).items())
+
+
+def build_crossref_xml_for_configs(poa_articles, crossref_configs, pub_date=None,
+                                   add_comment=True, submission_type='journal'):
+    """
+    build a deposit of the articles for each config, for example for each publisher,
+    tags which do not depend on the config are built once and shared by the deposits,
+    returns the CrossrefXML objects in the order of the configs
+    """
+    # one pub date so the deposits have matching timestamps
+    if pub_date is None:
+        pub_date = time.gmtime()
+    with shared.sharing():
+        return [
+            CrossrefXML(poa_articles, crossref_config, pub_date, add_comment, submission_type)
+            for crossref_config in crossref_configs]
+
+
+def crossref_xml_for_configs(poa_articles, crossref_configs, pub_date=None, add_comment=True,
+                             submission_type='journal', pretty=False, indent=""):
+    """build a deposit for each config and return the output in the order of the configs"""
+    return [
+        c_xml.output_xml(pretty=pretty, indent=indent)
+        for c_xml in build_crossref_xml_for_configs(
+            poa_articles, crossref_configs, pub_date, add_comment, submission_type)]
+
+
+def crossref_xml_to_stream(poa_articles, open_file, crossref_config=None, pub_date=None,
+                           add_comment=True, submission_type='journal', pretty=False, indent=""):
+    """
+    build crossref xml one record at a time and write it to a binary file-like object,
+    returns the batch id
+    """
+    if not crossref_config:
+        crossref_config = cached_config(None)
+    c_xml = CrossrefXMLStream(poa_articles, crossref_config, pub_date, add_comment,
+                              submission_type)
+    c_xml.write(open_file, pretty=pretty, indent=indent)
+    return c_xml.batch_id
+
+
 def crossref_xml_to_disk(poa_articles, crossref_config=None, pub_date=None, add_comment=True,
-                         submission_type='journal', pretty=False, indent=""):
-    """build crossref xml and write the output to disk"""
+                         submission_type='journal', pretty=False, indent="", stream=False,
+                         workers=None, fragment_cache=None):
+    """build crossref xml and write the output to disk, returns the file name"""
     if not crossref_config:
-        crossref_config = parse_raw_config(raw_config(None))
+        crossref_config = cached_config(None)
+    if stream:
+        c_xml = CrossrefXMLStream(
+            poa_articles, crossref_config, pub_date, add_comment, submission_type)
+        filename = TMP_DIR + os.sep + c_xml.batch_id + '.xml'
+        with open(filename, "wb") as open_file:
+            c_xml.write(open_file, pretty=pretty, indent=indent)
+        return filename
     c_xml = build_crossref_xml(
-        poa_articles, crossref_config, pub_date, add_comment, submission_type)
+        poa_articles, crossref_config, pub_date, add_comment, submission_type, workers,
+        fragment_cache)
     xml_string = c_xml.output_xml(pretty=pretty, indent=indent)
     # Write to file
     filename = TMP_DIR + os.sep + c_xml.batch_id + '.xml'
     with open(filename, "wb") as open_file:
         open_file.write(xml_string.encode('utf-8'))
+    return filename
+
+
+def crossref_build_parts(submission_type=None, crossref_config=None):
+    """
+    article parts read by the set_* functions for the submission_type,
+    all the parts used by either submission type if it is not specified
+    """
+    if submission_type == 'journal':
+        return list(JOURNAL_BUILD_PARTS)
+    if submission_type == 'peer_review':
+        build_parts = list(PEER_REVIEW_BUILD_PARTS)
+        # the parent article volume is only used to format the peer review resource URL
+        if not crossref_config or peer_review_url_uses_volume(crossref_config):
+            build_parts.append('volume')
+        return build_parts
+    return list(CROSSREF_BUILD_PARTS)
 
 
-def build_articles_for_crossref(article_xmls, detail='full', build_parts=None):
-    """specify some detail and build_parts specific to generating crossref output"""
-    build_parts = [
-        'abstract', 'basic', 'components', 'contributors', 'funding', 'datasets',
-        'license', 'pub_dates', 'references', 'related_articles', 'volume', 'sub_articles']
-    return build_articles(article_xmls, detail, build_parts)
+def peer_review_url_uses_volume(crossref_config):
+    """whether the peer_review_doi_pattern has a volume field, with any format spec"""
+    url_template = plan.url_template(crossref_config, 'peer_review_doi_pattern')
+    return bool(url_template and url_template.uses('volume'))
 
 
-def build_articles(article_xmls, detail='full', build_parts=None):
+def build_articles_for_crossref(article_xmls, detail='full', build_parts=None, workers=None,
+                                chunksize=1, submission_type=None, crossref_config=None):
+    """
+    specify some detail and build_parts specific to generating crossref output,
+    by default only the parts needed for the submission_type and crossref_config are parsed,
+    parse the files in a pool of processes if workers is greater than 1
+    """
+    if build_parts is None:
+        build_parts = crossref_build_parts(submission_type, crossref_config)
+    return build_articles(article_xmls, detail, build_parts, workers, chunksize)
+
+
+def build_articles(article_xmls, detail='full', build_parts=None, workers=None, chunksize=1):
+    if workers and workers > 1:
+        return build_articles_parallel(article_xmls, detail, build_parts, workers, chunksize)
     return parse.build_articles_from_article_xmls(article_xmls, detail, build_parts)
+
+
+def build_article(article_xml, detail='full', build_parts=None):
+    """parse a single article XML file, returns a list of the Article objects built"""
+    return parse.build_articles_from_article_xmls([article_xml], detail, build_parts)
+
+
+def build_articles_parallel(article_xmls, detail='full', build_parts=None, workers=None,
+                            chunksize=1):
+    """parse the article XML files in a process pool, returning Article objects in input order"""
+    build_function = partial(build_article, detail=detail, build_parts=build_parts)
+    articles = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for file_articles in executor.map(build_function, article_xmls, chunksize=chunksize):
+            articles += file_articles
+    return articles
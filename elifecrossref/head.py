@@ -1,16 +1,18 @@
 import time
 from xml.etree.ElementTree import SubElement
+from elifecrossref import instrument
 
 
 def set_head(parent, batch_id, pub_date, crossref_config):
-    head_tag = SubElement(parent, 'head')
-    doi_batch_id_tag = SubElement(head_tag, 'doi_batch_id')
-    doi_batch_id_tag.text = batch_id
-    timestamp_tag = SubElement(head_tag, 'timestamp')
-    timestamp_tag.text = time.strftime("%Y%m%d%H%M%S", pub_date)
-    set_depositor(head_tag, crossref_config)
-    registrant_tag = SubElement(head_tag, 'registrant')
-    registrant_tag.text = crossref_config.get("registrant")
+    with instrument.section('head', parent):
+        head_tag = SubElement(parent, 'head')
+        doi_batch_id_tag = SubElement(head_tag, 'doi_batch_id')
+        doi_batch_id_tag.text = batch_id
+        timestamp_tag = SubElement(head_tag, 'timestamp')
+        timestamp_tag.text = time.strftime("%Y%m%d%H%M%S", pub_date)
+        set_depositor(head_tag, crossref_config)
+        registrant_tag = SubElement(head_tag, 'registrant')
+        registrant_tag.text = crossref_config.get("registrant")
 
 
 def set_depositor(parent, crossref_config):
@@ -0,0 +1,98 @@
+"""
+skip generating a deposit when its JATS files, config, submission type, output options and
+the generator version are the same as when the existing output file was written,
+the output files and the hash of their input are recorded in a manifest file
+"""
+import hashlib
+import json
+import os
+import elifecrossref
+from elifecrossref import generate
+from elifecrossref.conf import cached_config
+
+
+MANIFEST_FILE_NAME = 'manifest.json'
+
+
+def manifest_path(output_dir):
+    return os.path.join(output_dir, MANIFEST_FILE_NAME)
+
+
+def load_manifest(manifest_file):
+    """manifest entries keyed on the input files, an empty manifest if there is no file"""
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, 'r') as open_file:
+        return json.load(open_file)
+
+
+def save_manifest(manifest, manifest_file):
+    # write to a temporary file first so an interrupted run does not leave a broken manifest
+    temp_file = manifest_file + '.tmp'
+    with open(temp_file, 'w') as open_file:
+        json.dump(manifest, open_file, indent=4, sort_keys=True)
+    os.replace(temp_file, manifest_file)
+
+
+def manifest_key(article_xmls):
+    return '\n'.join(os.path.abspath(article_xml) for article_xml in article_xmls)
+
+
+def content_hash(article_xmls, crossref_config, submission_type='journal', options=None):
+    """
+    hash of everything the output depends on, the pub date is not included
+    so a deposit is not generated again only because it is a different day,
+    the generator version is the code revision so a code change without a release counts
+    """
+    digest = hashlib.sha256()
+    for article_xml in article_xmls:
+        with open(article_xml, 'rb') as open_file:
+            digest.update(hashlib.sha256(open_file.read()).digest())
+    digest.update(json.dumps(
+        [crossref_config, submission_type, options, elifecrossref.__version__,
+         generate.generator_version()],
+        sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def cached_output(manifest, article_xmls, input_hash):
+    """file name of the output for the article_xmls if it is up to date and still exists"""
+    entry = manifest.get(manifest_key(article_xmls))
+    if (entry and entry.get('hash') == input_hash and entry.get('file_name')
+            and os.path.exists(entry.get('file_name'))):
+        return entry.get('file_name')
+    return None
+
+
+def record_output(manifest, article_xmls, input_hash, file_name):
+    # absolute paths so the manifest can be used from another working directory
+    manifest[manifest_key(article_xmls)] = {
+        'hash': input_hash, 'file_name': os.path.abspath(file_name)}
+
+
+def crossref_xml_to_disk(article_xmls, crossref_config=None, pub_date=None, add_comment=True,
+                         submission_type='journal', pretty=False, indent="", force=False,
+                         manifest_file=None):
+    """
+    parse the article_xmls and write their deposit with generate.crossref_xml_to_disk,
+    unless the manifest has an up to date output, or force is True,
+    returns the output file name and whether it was generated
+    """
+    if not crossref_config:
+        crossref_config = cached_config(None)
+    if not manifest_file:
+        manifest_file = manifest_path(generate.TMP_DIR)
+    manifest = load_manifest(manifest_file)
+    input_hash = content_hash(
+        article_xmls, crossref_config, submission_type,
+        {'add_comment': add_comment, 'pretty': pretty, 'indent': indent})
+    file_name = cached_output(manifest, article_xmls, input_hash)
+    if file_name and not force:
+        return file_name, False
+    articles = generate.build_articles_for_crossref(
+        article_xmls, submission_type=submission_type, crossref_config=crossref_config)
+    file_name = os.path.abspath(generate.crossref_xml_to_disk(
+        articles, crossref_config, pub_date, add_comment, submission_type, pretty, indent))
+    record_output(manifest, article_xmls, input_hash, file_name)
+    save_manifest(manifest, manifest_file)
+    return file_name, True
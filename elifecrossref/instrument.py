@@ -0,0 +1,105 @@
+"""
+optional timing of the steps which build the Crossref XML, for example
+
+    with instrument.timing() as timer:
+        generate.build_crossref_xml(articles, crossref_config)
+    summary = timer.summary()
+
+timings are only recorded in the process where the timer is set, not in worker processes
+"""
+import math
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+TIMER = ContextVar('elifecrossref_timer', default=None)
+
+
+class Timer(object):
+    """records the wall time and number of elements added by each named section"""
+
+    def __init__(self):
+        self.sections = OrderedDict()
+
+    def record(self, name, seconds, elements=0):
+        section = self.sections.setdefault(
+            name, {'calls': 0, 'seconds': 0.0, 'elements': 0})
+        section['calls'] += 1
+        section['seconds'] += seconds
+        section['elements'] += elements
+
+    def summary(self):
+        """totals for each section, slowest section first"""
+        return OrderedDict(
+            (name, dict(section)) for name, section in sorted(
+                self.sections.items(), key=lambda item: item[1].get('seconds'), reverse=True))
+
+
+@contextmanager
+def timing(timer=None):
+    """record sections run inside the with block using the timer, or a new Timer"""
+    if timer is None:
+        timer = Timer()
+    token = TIMER.set(timer)
+    try:
+        yield timer
+    finally:
+        TIMER.reset(token)
+
+
+def count_elements(parent):
+    """number of elements below the parent tag, at any depth"""
+    if parent is None:
+        return 0
+    return sum(1 for _ in parent.iter()) - 1
+
+
+@contextmanager
+def section(name, parent=None):
+    """
+    time the with block if a timer is set, counting the elements it adds anywhere below
+    the parent tag, sections are not nested so the summary totals add up
+    """
+    timer = TIMER.get()
+    if timer is None:
+        yield
+        return
+    element_count = count_elements(parent)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        timer.record(name, seconds, count_elements(parent) - element_count)
+
+
+def percentile(values, percent):
+    """nearest rank percentile of the values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(math.ceil(percent / 100.0 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+def summarise(timings):
+    """latency statistics in seconds for a list of timings"""
+    return {
+        'count': len(timings),
+        'total': sum(timings),
+        'mean': sum(timings) / len(timings) if timings else None,
+        'min': min(timings) if timings else None,
+        'p50': percentile(timings, 50),
+        'p90': percentile(timings, 90),
+        'p99': percentile(timings, 99),
+        'max': max(timings) if timings else None,
+    }
+
+
+def timed(function, *args, **kwargs):
+    """call the function and return its result and the seconds it took"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
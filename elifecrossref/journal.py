@@ -1,12 +1,15 @@
-from xml.etree.ElementTree import SubElement
+from xml.etree.ElementTree import Element, SubElement
 from elifearticle import utils as eautils
-from elifecrossref import dates, journal_article
+from elifecrossref import dates, journal_article, plan
 
 
 def set_journal(parent, poa_article, crossref_config, default_pub_date):
     # Add journal for each article
     journal_tag = SubElement(parent, 'journal')
-    set_journal_metadata(journal_tag, poa_article)
+    # the journal_metadata is built once for each journal and added to every record
+    journal_tag.append(plan.template(
+        crossref_config, ('journal_metadata', poa_article.journal_title, poa_article.journal_issn),
+        journal_metadata_tag, poa_article.journal_title, poa_article.journal_issn))
 
     journal_issue_tag = SubElement(journal_tag, 'journal_issue')
 
@@ -28,11 +31,15 @@ def set_journal(parent, poa_article, crossref_config, default_pub_date):
 
 
 def set_journal_metadata(parent, poa_article):
-    # journal_metadata
-    journal_metadata_tag = SubElement(parent, 'journal_metadata')
-    journal_metadata_tag.set("language", "en")
-    full_title_tag = SubElement(journal_metadata_tag, 'full_title')
-    full_title_tag.text = poa_article.journal_title
-    issn_tag = SubElement(journal_metadata_tag, 'issn')
+    parent.append(journal_metadata_tag(poa_article.journal_title, poa_article.journal_issn))
+
+
+def journal_metadata_tag(journal_title, journal_issn):
+    journal_metadata = Element('journal_metadata')
+    journal_metadata.set("language", "en")
+    full_title_tag = SubElement(journal_metadata, 'full_title')
+    full_title_tag.text = journal_title
+    issn_tag = SubElement(journal_metadata, 'issn')
     issn_tag.set("media_type", "electronic")
-    issn_tag.text = poa_article.journal_issn
+    issn_tag.text = journal_issn
+    return journal_metadata
@@ -1,68 +1,90 @@
-from xml.etree.ElementTree import SubElement
+from xml.etree.ElementTree import Element, SubElement
 from elifecrossref import (
     abstract, access_indicators, citation, component, contributor,
-    crossmark, dataset, dates, doi, funding, related, title)
+    crossmark, dataset, dates, doi, funding, instrument, plan, related, title)
 
 
 def set_journal_article(parent, poa_article, pub_date, crossref_config):
     journal_article_tag = SubElement(parent, 'journal_article')
     journal_article_tag.set("publication_type", "full_text")
-    if (crossref_config.get("reference_distribution_opts")
-            and crossref_config.get("reference_distribution_opts") != ''):
-        journal_article_tag.set(
-            "reference_distribution_opts",
-            crossref_config.get("reference_distribution_opts"))
+    distribution_opts = plan.value(crossref_config, 'reference_distribution_opts')
+    if distribution_opts:
+        journal_article_tag.set("reference_distribution_opts", distribution_opts)
 
     # Set the title with italic tag support
-    title.set_titles(journal_article_tag, poa_article.title, crossref_config)
+    with instrument.section('journal_article.titles', journal_article_tag):
+        title.set_titles(journal_article_tag, poa_article.title, crossref_config)
 
-    contributor.set_article_contributors(
-        journal_article_tag, poa_article, crossref_config.get("contrib_types"))
+    with instrument.section('journal_article.contributors', journal_article_tag):
+        contributor.set_article_contributors(
+            journal_article_tag, poa_article, plan.value(crossref_config, 'contrib_types'))
 
-    abstract.set_abstract(journal_article_tag, poa_article, crossref_config)
-    abstract.set_digest(journal_article_tag, poa_article, crossref_config)
+    with instrument.section('journal_article.abstract', journal_article_tag):
+        abstract.set_abstract(journal_article_tag, poa_article, crossref_config)
+    with instrument.section('journal_article.digest', journal_article_tag):
+        abstract.set_digest(journal_article_tag, poa_article, crossref_config)
 
     # Journal publication date
-    dates.set_publication_date(journal_article_tag, pub_date)
-
-    publisher_item_tag = SubElement(journal_article_tag, 'publisher_item')
-    if crossref_config.get("elocation_id") and poa_article.elocation_id:
-        item_number_tag = SubElement(publisher_item_tag, 'item_number')
-        item_number_tag.set("item_number_type", "article_number")
-        item_number_tag.text = poa_article.elocation_id
-    identifier_tag = SubElement(publisher_item_tag, 'identifier')
-    identifier_tag.set("id_type", "doi")
-    identifier_tag.text = poa_article.doi
+    with instrument.section('journal_article.publication_date', journal_article_tag):
+        dates.set_publication_date(journal_article_tag, pub_date)
+
+    with instrument.section('journal_article.publisher_item', journal_article_tag):
+        publisher_item_tag = SubElement(journal_article_tag, 'publisher_item')
+        if plan.value(crossref_config, 'elocation_id') and poa_article.elocation_id:
+            item_number_tag = SubElement(publisher_item_tag, 'item_number')
+            item_number_tag.set("item_number_type", "article_number")
+            item_number_tag.text = poa_article.elocation_id
+        identifier_tag = SubElement(publisher_item_tag, 'identifier')
+        identifier_tag.set("id_type", "doi")
+        identifier_tag.text = poa_article.doi
 
     # Crossmark data includes funding and access indicators, otherwise add them separately
     if crossmark.do_crossmark(poa_article, crossref_config):
-        crossmark.set_crossmark(journal_article_tag, poa_article, crossref_config)
+        with instrument.section('journal_article.crossmark', journal_article_tag):
+            crossmark.set_crossmark(journal_article_tag, poa_article, crossref_config)
     else:
-        funding.set_fundref(journal_article_tag, poa_article)
-        access_indicators.set_access_indicators(journal_article_tag, poa_article, crossref_config)
+        with instrument.section('journal_article.fundref', journal_article_tag):
+            funding.set_fundref(journal_article_tag, poa_article)
+        with instrument.section('journal_article.access_indicators', journal_article_tag):
+            access_indicators.set_access_indicators(
+                journal_article_tag, poa_article, crossref_config)
 
     # this is the spot to add the relations program tag if it is required
     relations_program_tag = None
-    if related.do_relations_program(poa_article) is True:
-        relations_program_tag = related.set_relations_program(
-            journal_article_tag, relations_program_tag)
+    with instrument.section('journal_article.relations_program', journal_article_tag):
+        if related.do_relations_program(poa_article) is True:
+            relations_program_tag = related.set_relations_program(
+                journal_article_tag, relations_program_tag)
 
-    dataset.set_datasets(relations_program_tag, poa_article)
+    with instrument.section('journal_article.datasets', journal_article_tag):
+        dataset.set_datasets(relations_program_tag, poa_article)
 
-    set_archive_locations(journal_article_tag,
-                          crossref_config.get("archive_locations"))
+    with instrument.section('journal_article.archive_locations', journal_article_tag):
+        archive_locations = plan.value(crossref_config, 'archive_locations')
+        if archive_locations:
+            journal_article_tag.append(plan.template(
+                crossref_config, ('archive_locations',), archive_locations_tag,
+                archive_locations))
 
-    doi.set_article_doi_data(journal_article_tag, poa_article, crossref_config)
+    with instrument.section('journal_article.doi_data', journal_article_tag):
+        doi.set_article_doi_data(journal_article_tag, poa_article, crossref_config)
 
-    citation.set_citation_list(
-        journal_article_tag, poa_article, relations_program_tag, crossref_config)
+    with instrument.section('journal_article.citation_list', journal_article_tag):
+        citation.set_citation_list(
+            journal_article_tag, poa_article, relations_program_tag, crossref_config)
 
-    component.set_component_list(journal_article_tag, poa_article, crossref_config)
+    with instrument.section('journal_article.component_list', journal_article_tag):
+        component.set_component_list(journal_article_tag, poa_article, crossref_config)
 
 
 def set_archive_locations(parent, archive_locations):
     if archive_locations:
-        archive_locations_tag = SubElement(parent, 'archive_locations')
-        for archive_location in archive_locations:
-            archive_tag = SubElement(archive_locations_tag, 'archive')
-            archive_tag.set('name', archive_location)
+        parent.append(archive_locations_tag(archive_locations))
+
+
+def archive_locations_tag(archive_locations):
+    archive_locations_element = Element('archive_locations')
+    for archive_location in archive_locations:
+        archive_tag = SubElement(archive_locations_element, 'archive')
+        archive_tag.set('name', archive_location)
+    return archive_locations_element
@@ -1,5 +1,5 @@
 from xml.etree.ElementTree import SubElement
-from elifecrossref import contributor, dates, doi, related, title, access_indicators
+from elifecrossref import contributor, dates, doi, instrument, related, title, access_indicators
 
 
 def set_peer_review(parent, poa_article, crossref_config):
@@ -10,28 +10,36 @@ def set_peer_review(parent, poa_article, crossref_config):
         set_type(peer_review_tag, review_article)
 
         if review_article.contributors:
-            contributor.set_contributors(peer_review_tag, review_article.contributors)
+            with instrument.section('peer_review.contributors', peer_review_tag):
+                contributor.set_contributors(peer_review_tag, review_article.contributors)
 
-        set_title(peer_review_tag, review_article, poa_article, crossref_config)
+        with instrument.section('peer_review.titles', peer_review_tag):
+            set_title(peer_review_tag, review_article, poa_article, crossref_config)
 
-        set_review_date(peer_review_tag, review_article.get_date('review_date'))
+        with instrument.section('peer_review.review_date', peer_review_tag):
+            set_review_date(peer_review_tag, review_article.get_date('review_date'))
 
         # set access indicators
         if review_article.license and review_article.license.href:
-            ai_program_tag = access_indicators.set_ai_program(peer_review_tag)
-            access_indicators.set_ai_license_ref(ai_program_tag, review_article.license.href)
+            with instrument.section('peer_review.access_indicators', peer_review_tag):
+                ai_program_tag = access_indicators.set_ai_program(peer_review_tag)
+                access_indicators.set_ai_license_ref(
+                    ai_program_tag, review_article.license.href)
 
         if review_article.related_articles:
-            # set the related article DOI to the first of the related_articles doi
-            related_article_doi = review_article.related_articles[0].doi
-            relations_program_tag = related.set_relations_program(peer_review_tag, None)
-            related_item_tag = SubElement(relations_program_tag, 'rel:related_item')
-            related.set_related_item_work_relation(
-                related_item_tag, 'inter_work_relation', 'isReviewOf', 'doi', related_article_doi)
-
-        doi.set_doi_data(
-            peer_review_tag, review_article, poa_article,
-            crossref_config, 'peer_review_doi_pattern')
+            with instrument.section('peer_review.relations_program', peer_review_tag):
+                # set the related article DOI to the first of the related_articles doi
+                related_article_doi = review_article.related_articles[0].doi
+                relations_program_tag = related.set_relations_program(peer_review_tag, None)
+                related_item_tag = SubElement(relations_program_tag, 'rel:related_item')
+                related.set_related_item_work_relation(
+                    related_item_tag, 'inter_work_relation', 'isReviewOf', 'doi',
+                    related_article_doi)
+
+        with instrument.section('peer_review.doi_data', peer_review_tag):
+            doi.set_doi_data(
+                peer_review_tag, review_article, poa_article,
+                crossref_config, 'peer_review_doi_pattern')
 
 
 def set_stage(parent):
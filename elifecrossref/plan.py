@@ -0,0 +1,198 @@
+"""
+a crossref_config with the decisions the builders make from it resolved once, for example
+
+    crossref_config = plan.compiled(crossref_config)
+
+the compiled config is still a read only dict of the config values, so it can be passed
+anywhere a crossref_config is expected, and builders which are given a plain dict compile it
+"""
+import re
+from functools import lru_cache
+from string import Formatter
+from elifecrossref.conf import FrozenDict
+
+
+# schema versions without a citation elocation_id tag, the elocation-id goes in first_page
+FIRST_PAGE_ELOCATION_ID_SCHEMA_VERSIONS = frozenset(['4.3.5', '4.3.7', '4.4.0'])
+
+# schema versions without the clinical trials and relations namespaces
+NO_RELATIONS_SCHEMA_VERSIONS = frozenset(['4.3.5'])
+
+URL_PATTERN_NAMES = (
+    'doi_pattern', 'component_doi_pattern', 'peer_review_doi_pattern',
+    'text_mining_xml_pattern', 'text_mining_pdf_pattern')
+
+FIELD_NAME_PATTERN = re.compile(r'[.\[]')
+
+
+class UrlTemplate(object):
+    """a URL pattern with the names of the fields it uses, found once when it is compiled"""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.fields = frozenset(
+            FIELD_NAME_PATTERN.split(field_name, 1)[0]
+            for _, field_name, _, _ in Formatter().parse(pattern) if field_name is not None)
+
+    def __bool__(self):
+        return bool(self.pattern)
+
+    def uses(self, *field_names):
+        return bool(self.fields.intersection(field_names))
+
+    def format(self, **values):
+        return self.pattern.format(**values)
+
+
+@lru_cache(maxsize=None)
+def root_attributes(schema_version):
+    """the doi_batch tag attributes for the schema version, as a tuple of (name, value)"""
+    attributes = [
+        ('version', schema_version),
+        ('xmlns', 'http://www.crossref.org/schema/%s' % schema_version),
+        ('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance'),
+        ('xmlns:fr', 'http://www.crossref.org/fundref.xsd'),
+        ('xmlns:ai', 'http://www.crossref.org/AccessIndicators.xsd'),
+    ]
+    if schema_version not in NO_RELATIONS_SCHEMA_VERSIONS:
+        attributes.append(('xmlns:ct', 'http://www.crossref.org/clinicaltrials.xsd'))
+        attributes.append(('xmlns:rel', 'http://www.crossref.org/relations.xsd'))
+    schema_location_name = 'http://www.crossref.org/schema/%s' % schema_version
+    schema_location_uri = 'http://www.crossref.org/schemas/crossref%s.xsd' % schema_version
+    attributes.append(
+        ('xsi:schemaLocation', '%s %s' % (schema_location_name, schema_location_uri)))
+    attributes.append(('xmlns:mml', 'http://www.w3.org/1998/Math/MathML'))
+    attributes.append(('xmlns:jats', 'http://www.ncbi.nlm.nih.gov/JATS1'))
+    return tuple(attributes)
+
+
+def citation_elocation_id_tag_name(schema_version):
+    if schema_version in FIRST_PAGE_ELOCATION_ID_SCHEMA_VERSIONS:
+        # Until alternate tag is available, elocation-id goes into first_page tag
+        return 'first_page'
+    # schema greater than 4.4.0 supports elocation_id
+    return 'elocation_id'
+
+
+def schema_root_attributes(crossref_config):
+    return root_attributes(crossref_config.get('crossref_schema_version'))
+
+
+def schema_citation_elocation_id_tag_name(crossref_config):
+    return citation_elocation_id_tag_name(crossref_config.get('crossref_schema_version'))
+
+
+def component_exclude_types(crossref_config):
+    return frozenset(crossref_config.get('component_exclude_types') or [])
+
+
+def reference_distribution_opts(crossref_config):
+    return crossref_config.get('reference_distribution_opts') or None
+
+
+def elife_style_component_doi(crossref_config):
+    return crossref_config.get('elife_style_component_doi') is True
+
+
+def crossmark(crossref_config):
+    return bool(crossref_config.get('crossmark'))
+
+
+def text_mining_xml(crossref_config):
+    return bool(
+        crossref_config.get('text_mining_xml_pattern')
+        and crossref_config.get('text_mining_pdf_pattern') != '')
+
+
+def text_mining_pdf(crossref_config):
+    return bool(crossref_config.get('text_mining_pdf_pattern'))
+
+
+# plan values which are the config value of the same name
+CONFIG_VALUES = (
+    'face_markup', 'contrib_types', 'archive_locations', 'component_license_ref',
+    'access_indicators_applies_to', 'elocation_id', 'crossmark_policy', 'crossmark_domains',
+    'crossmark_domain_exclusive')
+
+# plan values resolved from the config values
+RESOLVERS = {
+    'root_attributes': schema_root_attributes,
+    'citation_elocation_id_tag_name': schema_citation_elocation_id_tag_name,
+    'component_exclude_types': component_exclude_types,
+    'reference_distribution_opts': reference_distribution_opts,
+    'elife_style_component_doi': elife_style_component_doi,
+    'crossmark': crossmark,
+    'text_mining_xml': text_mining_xml,
+    'text_mining_pdf': text_mining_pdf,
+}
+
+
+class GenerationPlan(FrozenDict):
+    """the config values, with the feature flags, schema capabilities,
+    exclusion sets and URL templates the builders use resolved from them"""
+
+    def __init__(self, crossref_config):
+        super().__init__(crossref_config)
+        for name in CONFIG_VALUES:
+            setattr(self, name, self.get(name))
+        for name, resolve in RESOLVERS.items():
+            setattr(self, name, resolve(self))
+        self.root_attrib = dict(self.root_attributes)
+        self.url_templates = {
+            pattern_name: UrlTemplate(self.get(pattern_name))
+            for pattern_name in URL_PATTERN_NAMES if self.get(pattern_name) is not None}
+        # tags which are the same in every record, keyed on what else they depend on
+        self.templates = {}
+
+    def url_template(self, pattern_name):
+        """the compiled URL pattern, or None if there is no pattern in the config"""
+        url_template = self.url_templates.get(pattern_name)
+        if url_template is None and self.get(pattern_name) is not None:
+            url_template = UrlTemplate(self.get(pattern_name))
+        return url_template
+
+    def template(self, key, build_function, *args):
+        """
+        the tag returned by build_function(*args) the first time the key is used, and the same
+        tag after that, each record adds a reference to it so treat it as read only
+        """
+        tag = self.templates.get(key)
+        if tag is None:
+            tag = build_function(*args)
+            self.templates[key] = tag
+        return tag
+
+
+def compiled(crossref_config):
+    """the crossref_config as a GenerationPlan, compiling it if it is not one already"""
+    if isinstance(crossref_config, GenerationPlan):
+        return crossref_config
+    return GenerationPlan(crossref_config)
+
+
+def value(crossref_config, name):
+    """
+    the plan value from a GenerationPlan, or resolved from a plain crossref_config
+    without compiling the whole plan, for builders which may be given either
+    """
+    if isinstance(crossref_config, GenerationPlan):
+        return getattr(crossref_config, name)
+    if name in RESOLVERS:
+        return RESOLVERS[name](crossref_config)
+    return crossref_config.get(name)
+
+
+def url_template(crossref_config, pattern_name):
+    """the URL pattern from a GenerationPlan, or compiled from a plain crossref_config"""
+    if isinstance(crossref_config, GenerationPlan):
+        return crossref_config.url_template(pattern_name)
+    if crossref_config.get(pattern_name) is None:
+        return None
+    return UrlTemplate(crossref_config.get(pattern_name))
+
+
+def template(crossref_config, key, build_function, *args):
+    """the template tag from a GenerationPlan, or a new tag for a plain crossref_config"""
+    if isinstance(crossref_config, GenerationPlan):
+        return crossref_config.template(key, build_function, *args)
+    return build_function(*args)
@@ -1,5 +1,5 @@
 from elifearticle.article import Article, Component
-from elifecrossref import elife
+from elifecrossref import elife, plan
 
 
 def generate_resource_url(obj, poa_article, crossref_config, pattern_type=None):
@@ -7,14 +7,15 @@ def generate_resource_url(obj, poa_article, crossref_config, pattern_type=None):
     if isinstance(obj, Component) or pattern_type == "peer_review_doi_pattern":
         if not pattern_type:
             pattern_type = "component_doi_pattern"
+        url_template = plan.url_template(crossref_config, pattern_type)
+        id_value = obj.id
+        prefix1 = ''
         if (
                 pattern_type == "component_doi_pattern" and
-                crossref_config.get("elife_style_component_doi") is True):
+                plan.value(crossref_config, 'elife_style_component_doi') and
+                url_template.uses('id', 'prefix1')):
             id_value, prefix1 = elife.elife_style_component_attributes(obj)
-        else:
-            id_value = obj.id
-            prefix1 = ''
-        return crossref_config.get(pattern_type).format(
+        return url_template.format(
             doi=poa_article.doi,
             manuscript=poa_article.manuscript,
             volume=poa_article.volume,
@@ -23,9 +24,12 @@ def generate_resource_url(obj, poa_article, crossref_config, pattern_type=None):
     elif isinstance(obj, Article):
         if not pattern_type:
             pattern_type = "doi_pattern"
-        version = elife.elife_style_article_attributes(obj)
-        if crossref_config.get(pattern_type):
-            return crossref_config.get(pattern_type).format(
+        url_template = plan.url_template(crossref_config, pattern_type)
+        if url_template:
+            version = ''
+            if url_template.uses('version'):
+                version = elife.elife_style_article_attributes(obj)
+            return url_template.format(
                 doi=obj.doi,
                 manuscript=obj.manuscript,
                 volume=obj.volume,
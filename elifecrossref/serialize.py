@@ -0,0 +1,106 @@
+from xml.etree.ElementTree import Comment
+
+
+ENCODING = 'utf-8'
+
+
+def escape_data(data):
+    """escape text and attribute values the same way minidom does on output"""
+    if '&' in data:
+        data = data.replace('&', '&amp;')
+    if '<' in data:
+        data = data.replace('<', '&lt;')
+    if '"' in data:
+        data = data.replace('"', '&quot;')
+    if '>' in data:
+        data = data.replace('>', '&gt;')
+    return data
+
+
+def normalise_text(text):
+    """line endings in text are normalised when XML is parsed, do the same here"""
+    if '\r' in text:
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def xml_declaration(encoding=ENCODING):
+    return '<?xml version="1.0" encoding="%s"?>' % encoding
+
+
+def child_nodes(element):
+    """list the element text, child elements and their tails in document order"""
+    nodes = []
+    if element.text:
+        nodes.append(normalise_text(element.text))
+    for child in element:
+        nodes.append(child)
+        if child.tail:
+            nodes.append(normalise_text(child.tail))
+    return nodes
+
+
+def start_tag(element):
+    """opening tag with the attributes in sorted order"""
+    parts = ['<', element.tag]
+    for name in sorted(element.attrib):
+        parts.append(' %s="%s"' % (name, escape_data(element.attrib[name])))
+    return ''.join(parts)
+
+
+def write_node(write, node, indent='', addindent='', newl=''):
+    """
+    write an ElementTree node, its children and text in one pass,
+    with the same whitespace rules as minidom writexml
+    """
+    if isinstance(node, str):
+        write(escape_data(indent + node + newl))
+        return
+    if node.tag is Comment:
+        write('%s<!--%s-->%s' % (indent, node.text, newl))
+        return
+    write(indent)
+    write(start_tag(node))
+    nodes = child_nodes(node)
+    if not nodes:
+        write('/>%s' % newl)
+        return
+    write('>')
+    if len(nodes) == 1 and isinstance(nodes[0], str):
+        write(escape_data(nodes[0]))
+    else:
+        write(newl)
+        for child_node in nodes:
+            write_node(write, child_node, indent + addindent, addindent, newl)
+        write(indent)
+    write('</%s>%s' % (node.tag, newl))
+
+
+def write_start_tag(write, element, indent='', newl=''):
+    """write only the opening tag of an element which will have children"""
+    write('%s%s>%s' % (indent, start_tag(element), newl))
+
+
+def write_end_tag(write, element, indent='', newl=''):
+    write('%s</%s>%s' % (indent, element.tag, newl))
+
+
+def whitespace(pretty=False, indent=''):
+    """indent added per level and the newline value for pretty or compact output"""
+    if pretty is True:
+        return indent, '\n'
+    return '', ''
+
+
+def write_xml(write, root, pretty=False, indent='', encoding=ENCODING):
+    """write the XML declaration and the root element using the write callable"""
+    addindent, newl = whitespace(pretty, indent)
+    write(xml_declaration(encoding) + newl)
+    write_node(write, root, '', addindent, newl)
+
+
+def tostring(root, pretty=False, indent='', encoding=ENCODING):
+    """serialise the root element to a string"""
+    parts = []
+    write_xml(parts.append, root, pretty, indent, encoding)
+    return ''.join(parts)
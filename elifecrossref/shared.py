@@ -0,0 +1,47 @@
+"""
+reuse of subtrees which do not depend on the config, when the same articles are built
+with more than one config, for example
+
+    with shared.sharing():
+        for crossref_config in crossref_configs:
+            generate.build_crossref_xml(articles, crossref_config)
+
+the deposits built in the with block share the reused tags, treat them as read only
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from xml.etree.ElementTree import Element
+
+
+SUBTREES = ContextVar('elifecrossref_subtrees', default=None)
+
+
+@contextmanager
+def sharing(cache=None):
+    """reuse subtrees built inside the with block, using the cache dict or a new one"""
+    if cache is None:
+        cache = {}
+    token = SUBTREES.set(cache)
+    try:
+        yield cache
+    finally:
+        SUBTREES.reset(token)
+
+
+def add_subtree(parent, key, build_function, *args):
+    """
+    call build_function(parent, *args), or if sharing, add the tags it built
+    for the same key before, the key must include every value the tags depend on
+    """
+    cache = SUBTREES.get()
+    if cache is None:
+        return build_function(parent, *args)
+    cached = cache.get(key)
+    if cached is None:
+        build_parent = Element(parent.tag)
+        build_function(build_parent, *args)
+        # keep the args so objects identified by id() in the key stay in memory
+        cached = (list(build_parent), args)
+        cache[key] = cached
+    parent.extend(cached[0])
+    return None
@@ -0,0 +1,100 @@
+"""
+synthetic article objects of a chosen size, for testing how the generation scales
+with the number of contributors, references, components, datasets and funding awards
+"""
+import time
+from elifearticle.article import (
+    Affiliation, Article, ArticleDate, Citation, Component, Contributor, Dataset,
+    FundingAward, License)
+
+
+DOI_PREFIX = '10.7554'
+
+LICENSE_HREF = 'http://creativecommons.org/licenses/by/4.0/'
+
+PUB_DATE = time.strptime("2017-07-17 07:17:07", "%Y-%m-%d %H:%M:%S")
+
+
+def contributor(index, affiliations=1):
+    contributor_object = Contributor('author', 'Surname%s' % index, 'Given %s' % index)
+    contributor_object.orcid = 'http://orcid.org/0000-0002-%04d-%04d' % (
+        index // 10000 % 10000, index % 10000)
+    for aff_index in range(1, affiliations + 1):
+        aff = Affiliation()
+        aff.text = 'Department %s, Institute %s, City, Country' % (aff_index, index)
+        contributor_object.set_affiliation(aff)
+    return contributor_object
+
+
+def citation(index):
+    citation_object = Citation()
+    citation_object.id = 'bib%s' % index
+    citation_object.publication_type = 'journal'
+    citation_object.add_author(
+        {'surname': 'Author%s' % index, 'given-names': 'A', 'group-type': 'author'})
+    citation_object.article_title = 'Reference <italic>%s</italic> article title' % index
+    citation_object.source = 'Journal %s' % (index % 50)
+    citation_object.volume = str(index % 100 + 1)
+    citation_object.fpage = str(index)
+    citation_object.year = str(1990 + index % 30)
+    citation_object.doi = '%s/ref.%s' % (DOI_PREFIX, index)
+    return citation_object
+
+
+def component(index, article_doi):
+    component_object = Component()
+    component_object.id = 'fig%s' % index
+    component_object.type = 'fig'
+    component_object.asset = 'figsupp' if index % 2 else 'fig'
+    component_object.title = 'Figure %s.' % index
+    component_object.subtitle = 'Subtitle with <italic>markup</italic> %s' % index
+    component_object.mime_type = 'jpg'
+    component_object.permissions = [{'license': LICENSE_HREF}]
+    component_object.doi = '%s.%03d' % (article_doi, index)
+    return component_object
+
+
+def dataset(index):
+    dataset_object = Dataset()
+    dataset_object.dataset_type = 'datasets' if index % 2 else 'prev_published_datasets'
+    dataset_object.title = 'Dataset %s' % index
+    dataset_object.doi = '%s/dryad.%s' % (DOI_PREFIX, index)
+    return dataset_object
+
+
+def funding_award(index):
+    award = FundingAward()
+    award.award_group_id = 'fund%s' % index
+    award.award_ids = ['AWARD-%s' % index]
+    award.institution_name = 'Funder %s' % index
+    award.institution_id = 'http://dx.doi.org/10.13039/%09d' % index
+    award.principal_award_recipients = ['Recipient %s' % index]
+    return award
+
+
+def article(index=1, contributors=1, refs=0, components=0, datasets=0, funding_awards=0,
+            affiliations=1):
+    """an article object with the given number of each of its parts"""
+    manuscript = 90000 + index
+    doi = '%s/eLife.%05d' % (DOI_PREFIX, manuscript)
+    article_object = Article(doi, 'Synthetic article %s with <italic>markup</italic>' % index)
+    article_object.manuscript = manuscript
+    article_object.volume = '6'
+    article_object.version = 1
+    article_object.elocation_id = 'e%05d' % manuscript
+    article_object.article_type = 'research-article'
+    article_object.abstract = 'Abstract of synthetic article %s.' % index
+    license_object = License()
+    license_object.href = LICENSE_HREF
+    article_object.license = license_object
+    article_object.add_date(ArticleDate('pub', PUB_DATE))
+    for contrib_index in range(1, contributors + 1):
+        article_object.add_contributor(contributor(contrib_index, affiliations))
+    article_object.ref_list = [citation(ref_index) for ref_index in range(1, refs + 1)]
+    article_object.component_list = [
+        component(comp_index, doi) for comp_index in range(1, components + 1)]
+    for dataset_index in range(1, datasets + 1):
+        article_object.add_dataset(dataset(dataset_index))
+    article_object.funding_awards = [
+        funding_award(award_index) for award_index in range(1, funding_awards + 1)]
+    return article_object
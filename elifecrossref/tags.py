@@ -1,8 +1,12 @@
+import re
+from functools import lru_cache
 from xml.dom import minidom
+from xml.etree.ElementTree import Element, SubElement
+from xml.parsers import expat
 from elifetools import utils as etoolsutils
 from elifetools import xmlio
 from elifearticle import utils as eautils
-from elifecrossref import utils
+from elifecrossref import engine, utils
 
 
 # namespaces for when reparsing XML strings
@@ -10,8 +14,49 @@ REPARSING_NAMESPACES = (''' xmlns:jats="http://www.ncbi.nlm.nih.gov/JATS1"
  xmlns:mml="http://www.w3.org/1998/Math/MathML" xmlns:xlink="http://www.w3.org/1999/xlink" ''')
 
 
+# two opening angle brackets without a closing one between them, when removing one tag could
+# join the string around it into a new tag
+NESTED_ANGLE_BRACKET_PATTERN = re.compile(r'<[^>]*<')
+
+# tags removed by clean_tags which are not in the allowed_tags
+REMOVE_TAGS = ('inline-formula',)
+
+# the namespace of the xml prefix, e.g. in xml:lang
+XML_NAMESPACE = 'http://www.w3.org/XML/1998/namespace'
+
+
 def clean_tags(original_string, do_not_clean=None):
     """remove all unwanted inline tags from the string"""
+    if '<' not in original_string:
+        return original_string
+    if NESTED_ANGLE_BRACKET_PATTERN.search(original_string):
+        # remove tags one at a time in the same order as they have always been removed
+        return clean_tags_in_order(original_string, do_not_clean)
+    do_not_clean_tags = frozenset(do_not_clean) if do_not_clean else frozenset()
+    return clean_tags_pattern(do_not_clean_tags).sub('', original_string)
+
+
+@lru_cache(maxsize=None)
+def clean_tags_pattern(do_not_clean_tags=frozenset()):
+    """
+    compiled pattern matching every tag clean_tags removes, each match runs from an
+    opening angle bracket to the next closing one, as in eautils.remove_tag
+    """
+    patterns = []
+    for tag in utils.allowed_tags():
+        if tag not in do_not_clean_tags:
+            if tag.startswith('<') and tag.endswith('>'):
+                patterns.append(re.escape(tag))
+            if tag.startswith('<') and not tag.endswith('>'):
+                patterns.append('</?' + re.escape(tag.lstrip('</')) + '.*?>')
+    for tag in REMOVE_TAGS:
+        if tag not in do_not_clean_tags:
+            patterns.append('</?' + re.escape(tag) + '.*?>')
+    return re.compile('|'.join(patterns))
+
+
+def clean_tags_in_order(original_string, do_not_clean=None):
+    """remove all unwanted inline tags from the string, one tag at a time"""
     do_not_clean_tags = do_not_clean if do_not_clean else []
     tag_converted_string = original_string
     for tag in utils.allowed_tags():
@@ -23,8 +68,7 @@ def clean_tags(original_string, do_not_clean=None):
             if tag.startswith('<') and not tag.endswith('>'):
                 tag_fragment = tag.lstrip('</')
                 tag_converted_string = eautils.remove_tag(tag_fragment, tag_converted_string)
-    remove_tags = ['inline-formula']
-    for tag in remove_tags:
+    for tag in REMOVE_TAGS:
         if tag not in do_not_clean_tags:
             tag_converted_string = eautils.remove_tag(tag, tag_converted_string)
     return tag_converted_string
@@ -37,16 +81,176 @@ def add_clean_tag(parent, tag_name, original_string,
     tag_converted_string = etoolsutils.escape_ampersand(tag_converted_string)
     tag_converted_string = etoolsutils.escape_unmatched_angle_brackets(
         tag_converted_string)
-    minidom_tag = xmlio.reparsed_tag(tag_name, tag_converted_string, namespaces, attributes_text)
-    append_tag(parent, minidom_tag, attributes=attributes)
+    add_tag(parent, tag_name, tag_converted_string, namespaces, attributes, attributes_text)
 
 
 def add_inline_tag(parent, tag_name, original_string,
                    namespaces=REPARSING_NAMESPACES, attributes=None, attributes_text=''):
     """replace inline tags found in the original_string and then add a tag the parent"""
     tag_converted_string = convert_inline_tags(original_string)
-    minidom_tag = xmlio.reparsed_tag(tag_name, tag_converted_string, namespaces, attributes_text)
-    append_tag(parent, minidom_tag, attributes=attributes)
+    add_tag(parent, tag_name, tag_converted_string, namespaces, attributes, attributes_text)
+
+
+def add_tag(parent, tag_name, tag_string,
+            namespaces=REPARSING_NAMESPACES, attributes=None, attributes_text=''):
+    """parse the tag_string and add it to the parent in a tag named tag_name"""
+    if do_parse_inline_tag(tag_string):
+        parent.append(parse_inline_tag(
+            tag_name, tag_string, namespaces, attributes, attributes_text))
+    else:
+        minidom_tag = xmlio.reparsed_tag(tag_name, tag_string, namespaces, attributes_text)
+        append_tag(parent, minidom_tag, attributes=attributes)
+
+
+def do_parse_inline_tag(tag_string):
+    """
+    decide whether the tag_string can be parsed straight into ElementTree, otherwise
+    MathML, comments, CDATA and processing instructions are reparsed using minidom
+    """
+    return bool(
+        'mml:' not in tag_string
+        and '<!' not in tag_string
+        and '<?' not in tag_string)
+
+
+def tagged_string(tag_name, tag_string, namespaces=REPARSING_NAMESPACES, attributes_text=''):
+    """the tag_string wrapped in an open and close tag, as in xmlio.reparsed_tag"""
+    open_tag_parts = [value for value in [tag_name, namespaces, attributes_text] if value]
+    return '<%s>%s</%s>' % (' '.join(open_tag_parts), tag_string, tag_name)
+
+
+def parse_inline_tag(tag_name, tag_string, namespaces=REPARSING_NAMESPACES, attributes=None,
+                     attributes_text=''):
+    """
+    parse the tag_string into an ElementTree Element named tag_name, with the same result
+    as xmlio.reparsed_tag followed by append_tag
+    """
+    # namespaces declared inside the tag_string are left to expat to keep their order
+    if engine.current() == 'lxml' and 'xmlns' not in tag_string:
+        try:
+            return parse_inline_tag_lxml(
+                tag_name, tag_string, namespaces, attributes, attributes_text)
+        except engine.lxml_etree.XMLSyntaxError:
+            # parse it again with expat to raise the same error as the default engine
+            pass
+    builder = InlineTagBuilder()
+    parser = expat.ParserCreate(namespace_separator=' ')
+    parser.namespace_prefixes = True
+    parser.ordered_attributes = True
+    parser.buffer_text = True
+    parser.StartNamespaceDeclHandler = builder.start_namespace
+    parser.StartElementHandler = builder.start_element
+    parser.EndElementHandler = builder.end_element
+    parser.CharacterDataHandler = builder.character_data
+    parser.Parse(
+        tagged_string(tag_name, tag_string, namespaces, attributes_text).encode('utf-8'), True)
+    # only the named attributes are kept on the outer tag
+    for attribute in attributes if attributes else []:
+        if builder.root_attributes.get(attribute):
+            builder.root.set(attribute, builder.root_attributes.get(attribute))
+    return builder.root
+
+
+def parse_inline_tag_lxml(tag_name, tag_string, namespaces=REPARSING_NAMESPACES,
+                          attributes=None, attributes_text=''):
+    """parse_inline_tag using the lxml parser, copying the lxml tree to ElementTree"""
+    lxml_root = engine.lxml_etree.fromstring(
+        tagged_string(tag_name, tag_string, namespaces, attributes_text).encode('utf-8'))
+    prefixes = {uri: prefix for prefix, uri in lxml_root.nsmap.items()}
+    # the xml prefix is bound without a declaration so it is not in the nsmap
+    prefixes[XML_NAMESPACE] = 'xml'
+    root = Element(lxml_qualified_name(lxml_root.tag, prefixes))
+    root.text = lxml_root.text
+    # only the named attributes are kept on the outer tag
+    if attributes:
+        root_attributes = {
+            'xmlns:%s' % prefix if prefix else 'xmlns': uri
+            for prefix, uri in lxml_root.nsmap.items()}
+        root_attributes.update(
+            (lxml_qualified_name(name, prefixes), value)
+            for name, value in lxml_root.attrib.items())
+        for attribute in attributes:
+            if root_attributes.get(attribute):
+                root.set(attribute, root_attributes.get(attribute))
+    copy_lxml_children(root, lxml_root, prefixes)
+    return root
+
+
+def copy_lxml_children(parent, lxml_parent, prefixes):
+    for lxml_child in lxml_parent:
+        child = SubElement(parent, lxml_qualified_name(lxml_child.tag, prefixes))
+        for name, value in lxml_child.attrib.items():
+            child.set(lxml_qualified_name(name, prefixes), value)
+        child.text = lxml_child.text
+        child.tail = lxml_child.tail
+        copy_lxml_children(child, lxml_child, prefixes)
+
+
+def lxml_qualified_name(lxml_name, prefixes):
+    """convert an lxml name of {uri}local to prefix:local"""
+    if not lxml_name.startswith('{'):
+        return lxml_name
+    uri, local_name = lxml_name[1:].split('}', 1)
+    prefix = prefixes.get(uri)
+    return '%s:%s' % (prefix, local_name) if prefix else local_name
+
+
+def qualified_name(expat_name):
+    """convert an expat namespace name of 'uri local prefix' to prefix:local"""
+    name_parts = expat_name.split(' ')
+    if len(name_parts) == 3:
+        return '%s:%s' % (name_parts[2], name_parts[1])
+    return name_parts[-1]
+
+
+class InlineTagBuilder(object):
+    """builds ElementTree elements from expat parser events"""
+
+    def __init__(self):
+        self.root = None
+        self.root_attributes = {}
+        self.elements = []
+        self.text = []
+        self.namespace_attributes = []
+
+    def start_namespace(self, prefix, uri):
+        # namespace declarations come first in the element attributes, as in minidom
+        self.namespace_attributes.append(('xmlns:%s' % prefix if prefix else 'xmlns', uri))
+
+    def start_element(self, name, attribute_list):
+        self.add_text()
+        attributes = self.namespace_attributes + [
+            (qualified_name(attribute_list[index]), attribute_list[index + 1])
+            for index in range(0, len(attribute_list), 2)]
+        self.namespace_attributes = []
+        if self.root is None:
+            element = Element(qualified_name(name))
+            self.root = element
+            self.root_attributes = dict(attributes)
+        else:
+            element = SubElement(self.elements[-1], qualified_name(name))
+            for attribute_name, value in attributes:
+                element.set(attribute_name, value)
+        self.elements.append(element)
+
+    def end_element(self, name):
+        self.add_text()
+        self.elements.pop()
+
+    def character_data(self, data):
+        self.text.append(data)
+
+    def add_text(self):
+        """text goes in the current element text, or the tail of its last child element"""
+        if not self.text:
+            return
+        text = ''.join(self.text)
+        self.text = []
+        element = self.elements[-1]
+        if len(element):
+            element[-1].tail = text
+        else:
+            element.text = text
 
 
 def append_tag(parent, minidom_tag, attributes=None):
@@ -1,18 +1,23 @@
 from xml.etree.ElementTree import Element
 from elifearticle import utils as eautils
-from elifecrossref import tags
+from elifecrossref import plan, shared, tags
 
 
 def set_titles(parent, title, crossref_config):
     """
     Set the titles and title tags allowing sub tags within title
     """
+    face_markup = plan.value(crossref_config, 'face_markup') is True
+    shared.add_subtree(parent, ('titles', title, face_markup), build_titles, title, face_markup)
+
+
+def build_titles(parent, title, face_markup):
     root_tag_name = 'titles'
     tag_name = 'title'
     root_xml_element = Element(root_tag_name)
     # remove unwanted tags
     tag_converted_title = eautils.remove_tag('ext-link', title)
-    if crossref_config.get('face_markup') is True:
+    if face_markup:
         tags.add_inline_tag(root_xml_element, tag_name, tag_converted_title)
     else:
         tags.add_clean_tag(root_xml_element, tag_name, tag_converted_title)
@@ -19,6 +19,14 @@ setup(
         "configparser",
         "requests"
     ],
+    extras_require={
+        'lxml': ['lxml'],
+    },
+    entry_points={
+        'console_scripts': [
+            'elifecrossref-generate=elifecrossref.cli:main',
+        ],
+    },
     url='https://github.com/elifesciences/elife-crossref-xml-generation',
     maintainer='eLife Sciences Publications Ltd.',
     maintainer_email='py@elifesciences.org',
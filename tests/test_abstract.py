@@ -1,4 +1,5 @@
 import unittest
+from xml.dom import minidom
 from xml.etree import ElementTree
 from xml.etree.ElementTree import Element
 from elifecrossref import abstract
@@ -42,6 +43,44 @@ class TestGetJatsAbstract(unittest.TestCase):
         self.assertEqual(abstract.get_jats_abstract(string), expected)
 
 
+class TestConvertJatsTags(unittest.TestCase):
+
+    def test_convert_jats_tags(self):
+        passes = [
+            ('<sec id="s1"><title>Title</title><p>A <italic>B</italic> <sc>C</sc></p></sec>',
+             '<jats:sec id="s1"><jats:title>Title</jats:title>'
+             '<jats:p>A <jats:italic>B</jats:italic> <jats:sc>C</jats:sc></jats:p></jats:sec>'),
+            ('<p content-type="x">Not renamed</p><xref ref-type="bibr" rid="bib1">1</xref>',
+             '<p content-type="x">Not renamed</jats:p>'
+             '<jats:xref ref-type="bibr" rid="bib1">1</jats:xref>'),
+            # nested angle brackets are renamed one tag at a time
+            ('<sec id="<p>"><p>Text</p></sec>',
+             '<jats:sec id="<jats:p>"><jats:p>Text</jats:p></jats:sec>'),
+        ]
+        for string, expected in passes:
+            self.assertEqual(abstract.convert_jats_tags(string), expected)
+            self.assertEqual(abstract.convert_jats_tags_in_order(string), expected)
+
+
+class TestAddNamespaceAttributes(unittest.TestCase):
+
+    def test_add_namespace_attributes(self):
+        minidom_tag = minidom.parseString(
+            '<jats:abstract xmlns:jats="http://www.ncbi.nlm.nih.gov/JATS1"'
+            ' xmlns:mml="http://www.w3.org/1998/Math/MathML"'
+            ' xmlns:xlink="http://www.w3.org/1999/xlink">'
+            '<jats:p>Paragraph</jats:p>'
+            '<jats:p><jats:ext-link xlink:href="https://example.org">Link</jats:ext-link>'
+            '<mml:math><mml:mi>x</mml:mi></mml:math></jats:p>'
+            '</jats:abstract>')
+        p_tags = minidom_tag.getElementsByTagName('jats:p')
+        self.assertEqual(abstract.add_namespace_attributes(p_tags[0]), [])
+        self.assertEqual(
+            abstract.add_namespace_attributes(p_tags[1]), ['xmlns:mml', 'xmlns:xlink'])
+        self.assertEqual(
+            p_tags[1].getAttribute('xmlns:mml'), 'http://www.w3.org/1998/Math/MathML')
+
+
 class TestSetAbstractTag(unittest.TestCase):
 
     def test_set_abstract_tag(self):
@@ -0,0 +1,91 @@
+import unittest
+import time
+import os
+from elifecrossref import batch, generate, synthetic
+from tests import TEST_BASE_PATH, create_crossref_config
+
+
+generate.TMP_DIR = TEST_BASE_PATH + "tmp" + os.sep
+
+PUB_DATE = time.strptime("2017-07-17 07:17:07", "%Y-%m-%d %H:%M:%S")
+
+
+def synthetic_articles(count):
+    return [synthetic.article(index=index, refs=index) for index in range(1, count + 1)]
+
+
+class TestSplit(unittest.TestCase):
+
+    def test_split_by_count(self):
+        self.assertEqual(batch.split_by_count([1, 2, 3, 4, 5], 2), [[1, 2], [3, 4], [5]])
+        self.assertEqual(batch.split_by_count([1, 2, 3], 0), [[1, 2, 3]])
+        self.assertEqual(batch.split_by_count([], 2), [])
+
+    def test_split_by_size(self):
+        def overhead(index, batch_number):
+            return 10
+        self.assertEqual(
+            batch.split_by_size([5, 5, 5, 30, 5], overhead, 25), [[0, 1, 2], [3], [4]])
+        self.assertEqual(
+            batch.split_by_size([5, 5, 5, 30, 5], overhead, 25, 2), [[0, 1], [2], [3], [4]])
+
+
+class TestCrossrefXMLBatches(unittest.TestCase):
+
+    def setUp(self):
+        self.crossref_config = create_crossref_config('elife')
+
+    def test_one_batch(self):
+        articles = synthetic_articles(3)
+        batches = batch.crossref_xml_batches(
+            articles, self.crossref_config, PUB_DATE, False)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(batches[0][0], 'elife-crossref-90001-20170717071707')
+        self.assertEqual(
+            batches[0][1],
+            generate.crossref_xml(articles, self.crossref_config, PUB_DATE, False))
+
+    def test_max_articles(self):
+        batches = batch.crossref_xml_batches(
+            synthetic_articles(5), self.crossref_config, PUB_DATE, False, max_articles=2)
+        self.assertEqual(
+            [batch_id for batch_id, _ in batches],
+            ['elife-crossref-90001-20170717071707-1',
+             'elife-crossref-90003-20170717071707-2',
+             'elife-crossref-90005-20170717071707-3'])
+        self.assertEqual(
+            [xml_string.count('<journal>') for _, xml_string in batches], [2, 2, 1])
+
+    def test_max_bytes(self):
+        articles = synthetic_articles(6)
+        max_bytes = 12000
+        batches = batch.crossref_xml_batches(
+            articles, self.crossref_config, PUB_DATE, False, pretty=True, indent="\t",
+            max_bytes=max_bytes)
+        self.assertTrue(len(batches) > 1)
+        self.assertEqual(sum(xml_string.count('<journal>') for _, xml_string in batches), 6)
+        for _, xml_string in batches:
+            self.assertTrue(len(xml_string.encode('utf-8')) <= max_bytes)
+
+    def test_parallel(self):
+        articles = synthetic_articles(4)
+        expected = batch.crossref_xml_batches(
+            articles, self.crossref_config, PUB_DATE, False, max_articles=3)
+        self.assertEqual(
+            batch.crossref_xml_batches(
+                articles, self.crossref_config, PUB_DATE, False, max_articles=3, workers=2),
+            expected)
+
+    def test_to_disk(self):
+        file_names = batch.crossref_xml_batches_to_disk(
+            synthetic_articles(2), self.crossref_config, PUB_DATE, False, max_articles=1)
+        self.assertEqual(
+            [os.path.basename(file_name) for file_name in file_names],
+            ['elife-crossref-90001-20170717071707-1.xml',
+             'elife-crossref-90002-20170717071707-2.xml'])
+        for file_name in file_names:
+            self.assertTrue(os.path.exists(file_name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from xml.etree import ElementTree
+from elifecrossref import bench, tags
+from tests import TEST_DATA_PATH, create_crossref_config
+
+
+class TestArticleXmlFiles(unittest.TestCase):
+
+    def test_article_xml_files(self):
+        article_xmls = bench.article_xml_files(TEST_DATA_PATH)
+        self.assertTrue(TEST_DATA_PATH + 'elife-00666.xml' in article_xmls)
+        self.assertFalse(
+            [article_xml for article_xml in article_xmls if 'crossref' in article_xml])
+
+
+class TestConfigSection(unittest.TestCase):
+
+    def test_config_section(self):
+        self.assertEqual(bench.config_section(TEST_DATA_PATH + 'elife_poa_e02725.xml'), 'elife')
+        self.assertEqual(bench.config_section(TEST_DATA_PATH + 'cstp77-jats.xml'), 'cstp')
+        self.assertEqual(bench.config_section(TEST_DATA_PATH + 'up-sta-example.xml'), None)
+
+
+class TestRunBenchmark(unittest.TestCase):
+
+    def test_run_benchmark(self):
+        article_xmls = [TEST_DATA_PATH + 'elife-00666.xml']
+        results = bench.run_benchmark(article_xmls, repeat=1)
+        self.assertEqual(results.get('files'), 1)
+        stages = results.get('stages')
+        self.assertEqual(stages.get('build_articles_for_crossref').get('count'), 1)
+        for submission_type in bench.SUBMISSION_TYPES:
+            self.assertEqual(
+                stages.get(submission_type).get('build_crossref_xml').get('count'), 1)
+            self.assertTrue(stages.get(submission_type).get('output_xml').get('peak_memory') > 0)
+            self.assertTrue(stages.get(submission_type).get('articles_per_second') > 0)
+
+
+class TestRunInlineTagBenchmark(unittest.TestCase):
+
+    def test_run_inline_tag_benchmark(self):
+        results = bench.run_inline_tag_benchmark(number=2)
+        self.assertEqual(results.get('strings'), len(bench.INLINE_TAG_STRINGS))
+        for stage in ['parse_inline_tag', 'reparsed_tag']:
+            self.assertEqual(
+                results.get('stages').get(stage).get('count'), len(bench.INLINE_TAG_STRINGS))
+            self.assertTrue(results.get('stages').get(stage).get('tags_per_second') > 0)
+
+    def test_reparse_inline_tag(self):
+        for tag_string in bench.INLINE_TAG_STRINGS:
+            self.assertEqual(
+                ElementTree.tostring(bench.reparse_inline_tag('title', tag_string)[0]),
+                ElementTree.tostring(tags.parse_inline_tag('title', tag_string)))
+
+
+class TestRunEngineBenchmark(unittest.TestCase):
+
+    def test_run_engine_benchmark(self):
+        article_xmls = [TEST_DATA_PATH + 'elife-00666.xml']
+        results = bench.run_engine_benchmark(
+            article_xmls, engine_names=['stdlib'], submission_types=['journal'], memory=False)
+        engine_results = results.get('engines').get('stdlib')
+        self.assertEqual(engine_results.get('engine'), 'stdlib')
+        self.assertEqual(
+            engine_results.get('stages').get('journal').get('build_crossref_xml').get('count'), 1)
+
+
+class TestRunScalingBenchmark(unittest.TestCase):
+
+    def test_run_scaling_benchmark(self):
+        results = bench.run_scaling_benchmark(
+            dimensions=('contributors', 'refs'), sizes=(1, 5), memory=False)
+        scaling = results.get('scaling')
+        self.assertEqual(sorted(scaling.keys()), ['contributors', 'refs'])
+        self.assertEqual([point.get('size') for point in scaling.get('refs')], [1, 5])
+        self.assertEqual(scaling.get('refs')[0].get('seconds').get('count'), 1)
+        self.assertIsNone(scaling.get('refs')[0].get('peak_memory'))
+
+    def test_scaling_point_memory(self):
+        crossref_config = create_crossref_config('elife')
+        point = bench.scaling_point(crossref_config, 'components', 2)
+        self.assertTrue(point.get('peak_memory') > 0)
+
+
+class TestRunBatchBenchmark(unittest.TestCase):
+
+    def test_run_batch_benchmark(self):
+        results = bench.run_batch_benchmark(count=2)
+        self.assertEqual(results.get('articles'), 2)
+        self.assertEqual(
+            sorted(results.get('stages').keys()),
+            ['build_crossref_xml', 'records_compiled_once', 'records_compiled_per_article'])
+        self.assertEqual(results.get('stages').get('build_crossref_xml').get('count'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
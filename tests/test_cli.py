@@ -0,0 +1,164 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+import requests
+from elifecrossref import cli, clinical_trials, synthetic
+from tests import FIXTURES_PATH, TEST_DATA_PATH, create_crossref_config, read_file_content
+
+
+REGISTRY_URL = 'https://doi.org/10.18810/registries'
+
+
+def preload_registries():
+    clinical_trials.preload_registries(
+        REGISTRY_URL, read_file_content(FIXTURES_PATH + 'clinical_trial_registries.xml'))
+
+
+class TestArticleXmlPaths(unittest.TestCase):
+
+    def test_article_xml_paths(self):
+        article_xmls = cli.article_xml_paths(
+            [TEST_DATA_PATH + 'elife-0*.xml', TEST_DATA_PATH + 'elife-00666.xml'])
+        self.assertEqual(article_xmls[0], TEST_DATA_PATH + 'elife-00508-v1.xml')
+        self.assertEqual(article_xmls.count(TEST_DATA_PATH + 'elife-00666.xml'), 1)
+
+    def test_directory(self):
+        article_xmls = cli.article_xml_paths([TEST_DATA_PATH])
+        self.assertTrue(os.path.join(TEST_DATA_PATH, 'cstp77-jats.xml') in article_xmls)
+
+    def test_chunks(self):
+        self.assertEqual(cli.chunks(['a', 'b', 'c'], 2), [['a', 'b'], ['c']])
+
+
+class TestPrefetchRegistries(unittest.TestCase):
+
+    def setUp(self):
+        clinical_trials.clear_registry_cache()
+
+    def tearDown(self):
+        clinical_trials.clear_registry_cache()
+
+    def test_prefetch_registries(self):
+        preload_registries()
+        crossref_config = create_crossref_config('elife')
+        self.assertIsNone(cli.prefetch_registries(crossref_config, 'peer_review'))
+        self.assertIsNone(cli.prefetch_registries(create_crossref_config('cstp'), 'journal'))
+        registries_future = cli.prefetch_registries(crossref_config, 'journal')
+        registry_maps = cli.prefetched_registry_maps(registries_future, crossref_config)
+        self.assertEqual(
+            registry_maps.get(REGISTRY_URL).get('ISRCTN'), '10.18810/isrctn')
+
+    @patch('elifecrossref.clinical_trials.fetch_registries_xml',
+           side_effect=requests.exceptions.ConnectionError('registry unreachable'))
+    def test_prefetch_failed(self, fake_fetch):
+        crossref_config = create_crossref_config('elife')
+        registries_future = cli.prefetch_registries(crossref_config, 'journal')
+        with patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertIsNone(cli.prefetched_registry_maps(registries_future, crossref_config))
+        self.assertIn('registry unreachable', stderr.getvalue())
+
+
+class TestRegistries(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        clinical_trials.clear_registry_cache()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+        clinical_trials.clear_registry_cache()
+
+    @patch('elifecrossref.clinical_trials.do_clinical_trials', return_value=True)
+    @patch('elifecrossref.clinical_trials.fetch_registries_xml',
+           return_value=read_file_content(FIXTURES_PATH + 'clinical_trial_registries.xml'))
+    @patch('elifecrossref.generate.build_articles_for_crossref',
+           return_value=[synthetic.article(index=1)])
+    def test_prefetched(self, fake_build_articles, fake_fetch, fake_do_clinical_trials):
+        """the registries are fetched once, at the start of the run"""
+        with patch('sys.stdout', new_callable=io.StringIO):
+            status = cli.main([TEST_DATA_PATH + 'elife-00666.xml', '--config-section', 'elife',
+                               '--output-dir', self.output_dir])
+        self.assertEqual(status, 0)
+        fake_fetch.assert_called_once_with(REGISTRY_URL)
+
+    @patch('elifecrossref.clinical_trials.fetch_registries_xml',
+           side_effect=requests.exceptions.ConnectionError('registry unreachable'))
+    @patch('elifecrossref.generate.build_articles_for_crossref',
+           return_value=[synthetic.article(index=1)])
+    def test_prefetch_failed(self, fake_build_articles, fake_fetch):
+        """a failed prefetch is reported, and does not fail chunks which do not need it"""
+        with patch('sys.stdout', new_callable=io.StringIO), \
+                patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            status = cli.main([TEST_DATA_PATH + 'elife-00666.xml', '--config-section', 'elife',
+                               '--output-dir', self.output_dir])
+        self.assertEqual(status, 0)
+        self.assertIn(
+            'could not fetch the clinical trials registries: registry unreachable',
+            stderr.getvalue())
+
+    @patch('elifecrossref.clinical_trials.do_clinical_trials', return_value=True)
+    @patch('elifecrossref.clinical_trials.fetch_registries_xml',
+           side_effect=requests.exceptions.ConnectionError('registry unreachable'))
+    @patch('elifecrossref.generate.build_articles_for_crossref',
+           return_value=[synthetic.article(index=1)])
+    def test_fetch_failed(self, fake_build_articles, fake_fetch, fake_do_clinical_trials):
+        """a registries fetch failure fails the chunk which needed them"""
+        results = cli.generate_chunks(
+            [[TEST_DATA_PATH + 'elife-00666.xml']], self.output_dir, 'elife')
+        fake_fetch.assert_called_once_with(REGISTRY_URL)
+        self.assertEqual(results[0].get('error'), 'ConnectionError: registry unreachable')
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+
+class TestMain(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        preload_registries()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+        clinical_trials.clear_registry_cache()
+
+    def test_main(self):
+        status = cli.main([
+            TEST_DATA_PATH + 'elife-00666.xml', TEST_DATA_PATH + 'elife-02020-v1.xml',
+            TEST_DATA_PATH + 'elife-15743-v1.xml', '--config-section', 'elife',
+            '--output-dir', self.output_dir, '--workers', '2', '--chunk-size', '2',
+            '--no-comment'])
+        self.assertEqual(status, 0)
+        file_names = sorted(os.listdir(self.output_dir))
+        self.assertEqual(len(file_names), 2)
+        self.assertTrue(file_names[0].startswith('elife-crossref-00666-'))
+
+    def test_incremental(self):
+        args = [TEST_DATA_PATH + 'elife-00666.xml', '--config-section', 'elife',
+                '--output-dir', self.output_dir, '--incremental']
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            self.assertEqual(cli.main(args), 0)
+            self.assertEqual(cli.main(args), 0)
+            self.assertEqual(cli.main(args + ['--force']), 0)
+        self.assertEqual(
+            [line for line in stdout.getvalue().splitlines() if line.startswith('skipped')],
+            ['skipped: 0', 'skipped: 1', 'skipped: 0'])
+
+    def test_failed(self):
+        output_dir = os.path.join(self.output_dir, 'missing')
+        results = cli.generate_chunks([[TEST_DATA_PATH + 'elife-00666.xml']], output_dir, 'elife')
+        self.assertTrue(results[0].get('error'))
+        stats = cli.throughput(results, 1.0)
+        self.assertEqual(stats.get('failed'), 1)
+        self.assertTrue('failed: 1' in cli.format_throughput(stats))
+
+    def test_programming_error(self):
+        """errors which are not from the input are raised, not counted as a failed chunk"""
+        with patch('elifecrossref.generate.build_articles_for_crossref', side_effect=TypeError):
+            with self.assertRaises(TypeError):
+                cli.generate_chunks([[TEST_DATA_PATH + 'elife-00666.xml']], self.output_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,9 @@
 import os
+import tempfile
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from unittest.mock import patch
 from collections import OrderedDict
 from xml.etree import ElementTree
@@ -15,6 +19,54 @@ class FakeResponse:
         self.status_code = status_code
         self.content = None
 
+    def raise_for_status(self):
+        pass
+
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    """serves the registries fixture, after failing or waiting if the server is set to"""
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.server.failures > 0:
+            self.server.failures -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        time.sleep(self.server.delay)
+        content = read_file_content(os.path.join(FIXTURES_PATH, 'clinical_trial_registries.xml'))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class RegistryServer(HTTPServer):
+    """local stand-in for the registries URL"""
+
+    def __init__(self, failures=0, delay=0):
+        super().__init__(('127.0.0.1', 0), RegistryHandler)
+        self.failures = failures
+        self.delay = delay
+        self.requests = 0
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%s/registries' % self.server_address[1]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
 
 class TestDoClinicalTrials(unittest.TestCase):
 
@@ -83,7 +135,13 @@ class TestSetClinicalTrials(unittest.TestCase):
 
 class TestRegistryNameMap(unittest.TestCase):
 
-    @patch.object(requests, 'get')
+    def setUp(self):
+        clinical_trials.clear_registry_cache()
+
+    def tearDown(self):
+        clinical_trials.clear_registry_cache()
+
+    @patch.object(requests.Session, 'get')
     def test_registry_name_to_doi_map(self, fake_get):
         registries_response = FakeResponse()
         registries_response.content = '<xml />'
@@ -97,6 +155,100 @@ class TestRegistryNameMap(unittest.TestCase):
         self.assertEqual(name_map, expected)
 
 
+    @patch.object(requests.Session, 'get')
+    def test_registry_name_to_doi_map_cached(self, fake_get):
+        registries_response = FakeResponse()
+        registries_response.content = read_file_content(
+            os.path.join(FIXTURES_PATH, 'clinical_trial_registries.xml'))
+        fake_get.return_value = registries_response
+        registry_url = 'https://example.org'
+        name_map = clinical_trials.registry_name_to_doi_map(registry_url)
+        self.assertEqual(clinical_trials.registry_name_to_doi_map(registry_url), name_map)
+        self.assertEqual(name_map.get('ISRCTN'), '10.18810/isrctn')
+        self.assertEqual(fake_get.call_count, 1)
+
+    @patch.object(requests.Session, 'get')
+    def test_registry_name_to_doi_map_cache_file(self, fake_get):
+        registries_xml = read_file_content(
+            os.path.join(FIXTURES_PATH, 'clinical_trial_registries.xml'))
+        registries_response = FakeResponse()
+        registries_response.content = registries_xml
+        fake_get.return_value = registries_response
+        registry_url = 'https://example.org'
+        with tempfile.TemporaryDirectory() as directory:
+            cache_file = os.path.join(directory, 'registries.xml')
+            clinical_trials.registry_name_to_doi_map(registry_url, cache_file)
+            self.assertEqual(read_file_content(cache_file), registries_xml)
+            # written to a temporary file and moved into place
+            self.assertEqual(os.listdir(directory), ['registries.xml'])
+            # a fresh process uses the cache file instead of fetching
+            clinical_trials.clear_registry_cache()
+            name_map = clinical_trials.registry_name_to_doi_map(registry_url, cache_file)
+            self.assertEqual(name_map.get('UTN'), '10.18810/utn')
+            self.assertEqual(fake_get.call_count, 1)
+            # an expired cache file is fetched again
+            clinical_trials.clear_registry_cache()
+            clinical_trials.registry_name_to_doi_map(registry_url, cache_file, cache_ttl=-1)
+            self.assertEqual(fake_get.call_count, 2)
+
+    @patch.object(requests.Session, 'get')
+    def test_preload_registries(self, fake_get):
+        registry_url = 'https://doi.org/10.18810/registries'
+        clinical_trials.preload_registries(registry_url, read_file_content(
+            os.path.join(FIXTURES_PATH, 'clinical_trial_registries.xml')))
+        name_map = clinical_trials.registry_name_to_doi_map(registry_url)
+        self.assertEqual(name_map.get('ClinicalTrials.gov'), '10.18810/clinical-trials-gov')
+        self.assertEqual(fake_get.call_count, 0)
+
+
+class TestFetchRegistriesXml(unittest.TestCase):
+
+    def setUp(self):
+        clinical_trials.clear_registry_cache()
+
+    def tearDown(self):
+        clinical_trials.clear_registry_cache()
+
+    def test_fetch_registries_xml(self):
+        with RegistryServer() as server:
+            registries_xml = clinical_trials.fetch_registries_xml(server.url)
+        self.assertEqual(
+            registries_xml,
+            read_file_content(os.path.join(FIXTURES_PATH, 'clinical_trial_registries.xml')))
+
+    def test_retries(self):
+        with RegistryServer(failures=2) as server:
+            clinical_trials.fetch_registries_xml(server.url, retries=2, backoff_factor=0)
+            self.assertEqual(server.requests, 3)
+
+    def test_too_many_failures(self):
+        with RegistryServer(failures=2) as server:
+            with self.assertRaises(requests.exceptions.RequestException):
+                clinical_trials.fetch_registries_xml(server.url, retries=1, backoff_factor=0)
+
+    def test_timeout(self):
+        with RegistryServer(delay=1) as server:
+            with self.assertRaises(requests.exceptions.RequestException):
+                clinical_trials.fetch_registries_xml(
+                    server.url, timeout=0.1, retries=0, backoff_factor=0)
+
+    def test_prefetch_registries(self):
+        with RegistryServer(delay=0.2) as server:
+            future = clinical_trials.prefetch_registries(server.url)
+            # a generation thread asking for the map waits for the prefetch
+            name_map = clinical_trials.registry_name_to_doi_map(server.url)
+            self.assertEqual(future.result(), name_map)
+            self.assertEqual(name_map.get('ISRCTN'), '10.18810/isrctn')
+            self.assertEqual(server.requests, 1)
+
+    @patch('elifecrossref.clinical_trials.fetch_registries_xml',
+           side_effect=requests.exceptions.ConnectionError('registry unreachable'))
+    def test_prefetch_failed(self, fake_fetch):
+        future = clinical_trials.prefetch_registries('https://example.org/registries')
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            future.result(timeout=5)
+
+
 class TestParseRegistriesXml(unittest.TestCase):
 
     def test_parse_registries_xml(self):
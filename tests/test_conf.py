@@ -1,3 +1,6 @@
+import os
+import pickle
+import tempfile
 import unittest
 from elifecrossref import conf
 
@@ -7,3 +10,54 @@ class TestConf(unittest.TestCase):
     def test_load_config(self):
         """test loading when no config file is specified for test coverage"""
         self.assertIsNotNone(conf.load_config(None))
+
+
+class TestCachedConfig(unittest.TestCase):
+
+    def setUp(self):
+        conf.clear_config_cache()
+
+    def tearDown(self):
+        conf.clear_config_cache()
+
+    def test_cached_config(self):
+        crossref_config = conf.cached_config('elife')
+        self.assertEqual(crossref_config, conf.freeze(
+            conf.parse_raw_config(conf.raw_config('elife'))))
+        self.assertIs(conf.cached_config('elife'), crossref_config)
+        self.assertIsNot(conf.cached_config('cstp'), crossref_config)
+
+    def test_cached_config_read_only(self):
+        crossref_config = conf.cached_config('elife')
+        with self.assertRaises(TypeError):
+            crossref_config['face_markup'] = True
+        self.assertEqual(crossref_config.get('contrib_types'), ('author', 'on-behalf-of'))
+        with self.assertRaises(TypeError):
+            crossref_config.get('crossmark_domains')[0]['domain'] = 'example.org'
+        # a copy can be changed
+        config_copy = dict(crossref_config)
+        config_copy['face_markup'] = True
+        self.assertTrue(config_copy.get('face_markup'))
+
+    def test_cached_config_pickle(self):
+        crossref_config = conf.cached_config('elife')
+        self.assertEqual(pickle.loads(pickle.dumps(crossref_config)), crossref_config)
+
+    def test_cached_config_file_modified(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config_file = os.path.join(directory, 'test.cfg')
+            with open(config_file, 'w') as open_file:
+                open_file.write('[DEFAULT]\nregistrant: one\n')
+            self.assertEqual(conf.cached_config(None, config_file).get('registrant'), 'one')
+            with open(config_file, 'w') as open_file:
+                open_file.write('[DEFAULT]\nregistrant: two\n')
+            modified_time = os.stat(config_file).st_mtime_ns + 1000000000
+            os.utime(config_file, ns=(modified_time, modified_time))
+            self.assertEqual(conf.cached_config(None, config_file).get('registrant'), 'two')
+            # the config parsed before the change is replaced, not kept
+            self.assertEqual(len(conf.CONFIG_CACHE), 1)
+
+    def test_clear_config_cache(self):
+        crossref_config = conf.cached_config('elife')
+        conf.clear_config_cache()
+        self.assertIsNot(conf.cached_config('elife'), crossref_config)
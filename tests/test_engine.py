@@ -0,0 +1,57 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from elifecrossref import body, engine, synthetic
+from tests import create_crossref_config
+
+
+class TestEngine(unittest.TestCase):
+
+    def test_default(self):
+        self.assertEqual(engine.current(), 'stdlib')
+        self.assertIn('stdlib', engine.available_engines())
+
+    def test_using(self):
+        with engine.using('stdlib') as engine_name:
+            self.assertEqual(engine_name, 'stdlib')
+            self.assertEqual(engine.current(), 'stdlib')
+        self.assertEqual(engine.current(), 'stdlib')
+
+    def test_using_unknown(self):
+        with self.assertRaises(ValueError):
+            with engine.using('unknown'):
+                pass
+
+
+@unittest.skipUnless('lxml' in engine.available_engines(), 'lxml is not installed')
+class TestParallelEngine(unittest.TestCase):
+    """the engine is sent to the pool, threads stand in for the processes as neither gets it"""
+
+    def setUp(self):
+        self.crossref_config = create_crossref_config('elife')
+        self.poa_articles = [synthetic.article(index=index) for index in range(1, 3)]
+        self.engines = []
+
+    def record_engine(self, *args):
+        self.engines.append(engine.current())
+
+    def test_build_records_parallel(self):
+        with patch('elifecrossref.body.ProcessPoolExecutor', ThreadPoolExecutor), \
+                patch('elifecrossref.body.set_record', side_effect=self.record_engine):
+            with engine.using('lxml'):
+                body.build_records_parallel(
+                    self.poa_articles, self.crossref_config, None, 'journal', 2)
+        self.assertEqual(self.engines, ['lxml', 'lxml'])
+
+    def test_build_article_records_parallel(self):
+        with patch('elifecrossref.body.ProcessPoolExecutor', ThreadPoolExecutor), \
+                patch('elifecrossref.body.set_record', side_effect=self.record_engine):
+            with engine.using('lxml'):
+                body.build_article_records_parallel(
+                    self.poa_articles, self.crossref_config, None,
+                    ['journal', 'peer_review'], 2)
+        self.assertEqual(self.engines, ['lxml'] * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import shutil
+import tempfile
+import time
+from elifecrossref import fragments, generate, synthetic
+from tests import create_crossref_config
+
+
+PUB_DATE = time.strptime("2017-07-17 07:17:07", "%Y-%m-%d %H:%M:%S")
+
+
+class TestFragmentKey(unittest.TestCase):
+
+    def setUp(self):
+        self.crossref_config = create_crossref_config('elife')
+        self.fingerprint = fragments.config_fingerprint(self.crossref_config)
+
+    def test_fragment_key(self):
+        article = synthetic.article()
+        key = fragments.fragment_key(
+            article, self.fingerprint, self.crossref_config, PUB_DATE, 'journal')
+        self.assertEqual(key, fragments.fragment_key(
+            synthetic.article(), self.fingerprint, self.crossref_config, PUB_DATE, 'journal'))
+        self.assertNotEqual(key, fragments.fragment_key(
+            article, self.fingerprint, self.crossref_config, PUB_DATE, 'peer_review'))
+        article.version = 2
+        self.assertNotEqual(key, fragments.fragment_key(
+            article, self.fingerprint, self.crossref_config, PUB_DATE, 'journal'))
+
+    def test_config_fingerprint(self):
+        self.assertNotEqual(
+            self.fingerprint, fragments.config_fingerprint(create_crossref_config('cstp')))
+
+
+class TestFragmentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.crossref_config = create_crossref_config('elife')
+        self.articles = [synthetic.article(index=index, refs=2) for index in range(1, 4)]
+        self.expected = generate.crossref_xml(
+            self.articles, self.crossref_config, PUB_DATE, False)
+
+    def test_records(self):
+        fragment_cache = fragments.FragmentCache()
+        # cache two of the articles then build a batch of all three
+        generate.build_crossref_xml(
+            self.articles[0:2], self.crossref_config, PUB_DATE, False,
+            fragment_cache=fragment_cache)
+        self.assertEqual(
+            generate.crossref_xml(
+                self.articles, self.crossref_config, PUB_DATE, False,
+                fragment_cache=fragment_cache),
+            self.expected)
+        self.assertEqual(fragment_cache.hits, 2)
+        self.assertEqual(fragment_cache.misses, 3)
+
+    def test_cache_dir(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            generate.build_crossref_xml(
+                self.articles, self.crossref_config, PUB_DATE, False,
+                fragment_cache=fragments.FragmentCache(cache_dir))
+            fragment_cache = fragments.FragmentCache(cache_dir)
+            self.assertEqual(
+                generate.crossref_xml(
+                    self.articles, self.crossref_config, PUB_DATE, False,
+                    fragment_cache=fragment_cache),
+                self.expected)
+            self.assertEqual(fragment_cache.hits, 3)
+        finally:
+            shutil.rmtree(cache_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
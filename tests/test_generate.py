@@ -1,8 +1,10 @@
+import io
 import unittest
 import time
 import os
+from unittest.mock import patch
 from xml.etree.ElementTree import Comment
-from elifecrossref import generate
+from elifecrossref import generate, instrument
 from tests import TEST_BASE_PATH, TEST_DATA_PATH, read_file_content, create_crossref_config
 
 
@@ -121,3 +123,155 @@ class TestGenerate(unittest.TestCase):
         expected_output = read_file_content(TEST_DATA_PATH + crossref_xml_file)
         generated_output = read_file_content(generate.TMP_DIR + crossref_xml_file)
         self.assertEqual(generated_output, expected_output)
+
+
+class TestGenerateStream(unittest.TestCase):
+
+    def setUp(self):
+        self.default_pub_date = time.strptime("2017-07-17 07:17:07", "%Y-%m-%d %H:%M:%S")
+
+    def test_crossref_xml_to_stream(self):
+        """streamed output is the same as the output when building the whole tree"""
+        article_xml_file = 'elife-00666.xml'
+        crossref_xml_file = 'elife-crossref-00666-20170717071707.xml'
+        file_path = TEST_DATA_PATH + article_xml_file
+        articles = generate.build_articles_for_crossref([file_path])
+        crossref_config = create_crossref_config('elife')
+        open_file = io.BytesIO()
+        batch_id = generate.crossref_xml_to_stream(
+            iter(articles), open_file, crossref_config, self.default_pub_date, False,
+            pretty=True, indent="\t")
+        self.assertEqual(batch_id, 'elife-crossref-00666-20170717071707')
+        expected_output = read_file_content(TEST_DATA_PATH + crossref_xml_file)
+        self.assertEqual(open_file.getvalue(), expected_output)
+
+    def test_crossref_xml_stream_no_articles(self):
+        crossref_config = create_crossref_config('elife')
+        c_xml = generate.CrossrefXMLStream([], crossref_config, self.default_pub_date, False)
+        self.assertTrue(c_xml.output_xml().endswith('</head><body/></doi_batch>'))
+
+    def test_crossref_xml_to_disk_stream(self):
+        article_xml_file = 'up-sta-example.xml'
+        crossref_xml_file = 'crossref-606-20170717071707.xml'
+        file_path = TEST_DATA_PATH + article_xml_file
+        articles = generate.build_articles_for_crossref([file_path])
+        generate.crossref_xml_to_disk(
+            articles, None, self.default_pub_date, False, "journal", pretty=True, indent="\t",
+            stream=True)
+        expected_output = read_file_content(TEST_DATA_PATH + crossref_xml_file)
+        generated_output = read_file_content(generate.TMP_DIR + crossref_xml_file)
+        self.assertEqual(generated_output, expected_output)
+
+
+class TestGenerateParallel(unittest.TestCase):
+
+    def test_crossref_xml_workers(self):
+        """output built in a process pool is the same as the serial output"""
+        default_pub_date = time.strptime("2017-07-17 07:17:07", "%Y-%m-%d %H:%M:%S")
+        file_paths = [TEST_DATA_PATH + file_name for file_name in [
+            'elife-00666.xml', 'elife-02935-v2.xml', 'elife_poa_e02725.xml']]
+        articles = generate.build_articles_for_crossref(file_paths)
+        crossref_config = create_crossref_config('elife')
+        for submission_type in ['journal', 'peer_review']:
+            expected = generate.crossref_xml(
+                articles, crossref_config, default_pub_date, False, submission_type)
+            crossref_xml = generate.crossref_xml(
+                articles, crossref_config, default_pub_date, False, submission_type, workers=2)
+            self.assertEqual(crossref_xml, expected)
+
+    def test_build_articles_for_crossref_workers(self):
+        """articles parsed in a process pool are returned in the input order"""
+        default_pub_date = time.strptime("2017-07-17 07:17:07", "%Y-%m-%d %H:%M:%S")
+        file_paths = [TEST_DATA_PATH + file_name for file_name in [
+            'elife-00666.xml', 'elife-02935-v2.xml', 'elife_poa_e02725.xml', 'elife-15743-v1.xml']]
+        expected_articles = generate.build_articles_for_crossref(file_paths)
+        articles = generate.build_articles_for_crossref(file_paths, workers=2, chunksize=2)
+        self.assertEqual(
+            [article.doi for article in articles],
+            [article.doi for article in expected_articles])
+        crossref_config = create_crossref_config('elife')
+        self.assertEqual(
+            generate.crossref_xml(articles, crossref_config, default_pub_date, False),
+            generate.crossref_xml(expected_articles, crossref_config, default_pub_date, False))
+
+
+class TestBuildParts(unittest.TestCase):
+
+    def test_crossref_build_parts(self):
+        self.assertEqual(generate.crossref_build_parts(), generate.CROSSREF_BUILD_PARTS)
+        self.assertFalse('sub_articles' in generate.crossref_build_parts('journal'))
+        peer_review_parts = generate.crossref_build_parts(
+            'peer_review', create_crossref_config('elife'))
+        self.assertTrue('sub_articles' in peer_review_parts)
+        self.assertFalse('references' in peer_review_parts)
+        self.assertFalse('volume' in peer_review_parts)
+        self.assertTrue('volume' in generate.crossref_build_parts('peer_review'))
+
+    def test_peer_review_volume_field(self):
+        for pattern in ['https://example.org/{volume}/{id}',
+                        'https://example.org/{volume:02d}/{id}',
+                        'https://example.org/{volume!s}/{id}']:
+            self.assertTrue('volume' in generate.crossref_build_parts(
+                'peer_review', {'peer_review_doi_pattern': pattern}))
+        self.assertFalse('volume' in generate.crossref_build_parts(
+            'peer_review', {'peer_review_doi_pattern': 'https://example.org/{volumes}/{id}'}))
+
+    def test_submission_type_output(self):
+        """parsing only the parts for the submission type gives the same output"""
+        default_pub_date = time.strptime("2017-07-17 07:17:07", "%Y-%m-%d %H:%M:%S")
+        file_paths = [TEST_DATA_PATH + file_name for file_name in [
+            'elife-00666.xml', 'elife-15743-v1.xml', 'elife_poa_e02725.xml']]
+        crossref_config = create_crossref_config('elife')
+        all_articles = generate.build_articles_for_crossref(file_paths)
+        for submission_type in ['journal', 'peer_review']:
+            articles = generate.build_articles_for_crossref(
+                file_paths, submission_type=submission_type, crossref_config=crossref_config)
+            self.assertEqual(
+                generate.crossref_xml(
+                    articles, crossref_config, default_pub_date, False, submission_type),
+                generate.crossref_xml(
+                    all_articles, crossref_config, default_pub_date, False, submission_type))
+
+
+class TestGeneratorVersion(unittest.TestCase):
+
+    def setUp(self):
+        generate.generator_version.cache_clear()
+
+    def tearDown(self):
+        generate.generator_version.cache_clear()
+
+    @patch.object(generate.eautils, 'get_last_commit_to_master')
+    def test_generator_version_cached(self, fake_last_commit):
+        fake_last_commit.return_value = 'abc123'
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop(generate.VERSION_ENV_VARIABLE, None)
+            self.assertEqual(generate.generator_version(), 'abc123')
+            self.assertEqual(generate.generator_version(), 'abc123')
+        self.assertEqual(fake_last_commit.call_count, 1)
+
+    @patch.object(generate.eautils, 'get_last_commit_to_master')
+    def test_generator_version_environment(self, fake_last_commit):
+        with patch.dict(os.environ, {generate.VERSION_ENV_VARIABLE: '0.1.1'}):
+            self.assertEqual(generate.generator_version(), '0.1.1')
+        self.assertEqual(fake_last_commit.call_count, 0)
+
+    def test_generator_version_config(self):
+        crossref_config = create_crossref_config('elife')
+        crossref_config['generator_version'] = 'v9'
+        c_xml = generate.CrossrefXML([], crossref_config, None, True)
+        self.assertTrue(' from version v9-->' in c_xml.output_xml())
+
+
+class TestGenerateTiming(unittest.TestCase):
+
+    def test_build_crossref_xml_timing(self):
+        file_path = TEST_DATA_PATH + 'elife-00666.xml'
+        articles = generate.build_articles_for_crossref([file_path])
+        crossref_config = create_crossref_config('elife')
+        with instrument.timing() as timer:
+            generate.build_crossref_xml(articles, crossref_config, None, False)
+        summary = timer.summary()
+        self.assertEqual(summary.get('head').get('calls'), 1)
+        self.assertEqual(summary.get('journal_article.titles').get('elements'), 2)
+        self.assertTrue(summary.get('journal_article.citation_list').get('elements') > 0)
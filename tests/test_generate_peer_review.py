@@ -94,3 +94,30 @@ class TestGeneratePeerReview(unittest.TestCase):
             model_crossref_xml = read_file_content(TEST_DATA_PATH + crossref_xml_file)
             self.assertEqual(crossref_xml, model_crossref_xml.decode('utf-8'),
                              'Failed parse test on file %s' % article_xml_file)
+
+
+class TestGenerateSubmissionTypes(unittest.TestCase):
+
+    def test_crossref_xmls(self):
+        """journal and peer_review output from one pass is the same as building each one"""
+        pub_date = time.strptime("2017-07-17 07:17:07", "%Y-%m-%d %H:%M:%S")
+        articles = generate.build_articles_for_crossref([TEST_DATA_PATH + 'elife-00666.xml'])
+        articles[0].review_articles = sample_data()
+        crossref_config = create_crossref_config('elife')
+        for workers in [None, 2]:
+            crossref_xmls = generate.crossref_xmls(
+                articles, crossref_config, pub_date, False, workers=workers)
+            self.assertEqual(list(crossref_xmls.keys()), ['journal', 'peer_review'])
+            for submission_type, crossref_xml in crossref_xmls.items():
+                self.assertEqual(
+                    crossref_xml,
+                    generate.crossref_xml(
+                        articles, crossref_config, pub_date, False, submission_type))
+
+    def test_build_crossref_xmls_batch_ids(self):
+        articles = generate.build_articles_for_crossref([TEST_DATA_PATH + 'elife-00666.xml'])
+        c_xmls = generate.build_crossref_xmls(articles, create_crossref_config('elife'))
+        journal_batch_id = c_xmls.get('journal').batch_id
+        self.assertEqual(
+            c_xmls.get('peer_review').batch_id,
+            journal_batch_id.replace('crossref-', 'crossref-peer_review-'))
@@ -0,0 +1,95 @@
+import unittest
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+from elifecrossref import generate, incremental
+from tests import TEST_DATA_PATH, create_crossref_config
+
+
+PUB_DATE = time.strptime("2017-07-17 07:17:07", "%Y-%m-%d %H:%M:%S")
+
+
+class TestContentHash(unittest.TestCase):
+
+    def setUp(self):
+        self.article_xmls = [TEST_DATA_PATH + 'elife-00666.xml']
+        self.crossref_config = create_crossref_config('elife')
+
+    def test_content_hash(self):
+        input_hash = incremental.content_hash(self.article_xmls, self.crossref_config)
+        self.assertEqual(
+            input_hash, incremental.content_hash(self.article_xmls, self.crossref_config))
+        self.assertNotEqual(
+            input_hash,
+            incremental.content_hash(self.article_xmls, self.crossref_config, 'peer_review'))
+        self.assertNotEqual(
+            input_hash,
+            incremental.content_hash(self.article_xmls, create_crossref_config('cstp')))
+        self.assertNotEqual(
+            input_hash,
+            incremental.content_hash([TEST_DATA_PATH + 'cstp77-jats.xml'], self.crossref_config))
+
+    def test_generator_version(self):
+        """a code change without a new release version changes the hash"""
+        with patch('elifecrossref.generate.generator_version', return_value='abc123'):
+            input_hash = incremental.content_hash(self.article_xmls, self.crossref_config)
+        with patch('elifecrossref.generate.generator_version', return_value='def456'):
+            self.assertNotEqual(
+                input_hash, incremental.content_hash(self.article_xmls, self.crossref_config))
+
+
+class TestManifest(unittest.TestCase):
+
+    def test_record_output(self):
+        """output file names are recorded as absolute paths"""
+        manifest = {}
+        incremental.record_output(manifest, ['article.xml'], 'hash', 'output.xml')
+        self.assertEqual(
+            manifest.get(incremental.manifest_key(['article.xml'])),
+            {'hash': 'hash', 'file_name': os.path.abspath('output.xml')})
+
+
+class TestCrossrefXMLToDisk(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.tmp_dir = generate.TMP_DIR
+        generate.TMP_DIR = self.output_dir
+        self.article_xmls = [TEST_DATA_PATH + 'elife-00666.xml']
+        self.crossref_config = create_crossref_config('elife')
+
+    def tearDown(self):
+        generate.TMP_DIR = self.tmp_dir
+        shutil.rmtree(self.output_dir)
+
+    def test_crossref_xml_to_disk(self):
+        file_name, generated = incremental.crossref_xml_to_disk(
+            self.article_xmls, self.crossref_config, PUB_DATE, False)
+        self.assertTrue(generated)
+        self.assertTrue(os.path.exists(file_name))
+        self.assertTrue(os.path.exists(incremental.manifest_path(self.output_dir)))
+        # nothing changed so it is not generated again
+        self.assertEqual(
+            incremental.crossref_xml_to_disk(
+                self.article_xmls, self.crossref_config, PUB_DATE, False),
+            (file_name, False))
+        # generated again when forced, or when the output options change
+        self.assertTrue(incremental.crossref_xml_to_disk(
+            self.article_xmls, self.crossref_config, PUB_DATE, False, force=True)[1])
+        self.assertTrue(incremental.crossref_xml_to_disk(
+            self.article_xmls, self.crossref_config, PUB_DATE, False, pretty=True)[1])
+
+    def test_output_removed(self):
+        file_name, _ = incremental.crossref_xml_to_disk(
+            self.article_xmls, self.crossref_config, PUB_DATE, False)
+        os.remove(file_name)
+        self.assertEqual(
+            incremental.crossref_xml_to_disk(
+                self.article_xmls, self.crossref_config, PUB_DATE, False),
+            (file_name, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
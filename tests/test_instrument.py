@@ -0,0 +1,73 @@
+import unittest
+from xml.etree.ElementTree import Element, SubElement
+from elifecrossref import instrument
+
+
+class TestSection(unittest.TestCase):
+
+    def test_section(self):
+        parent = Element('journal_article')
+        SubElement(parent, 'titles')
+        with instrument.timing() as timer:
+            with instrument.section('contributors', parent):
+                contributors_tag = SubElement(parent, 'contributors')
+                SubElement(contributors_tag, 'person_name')
+                SubElement(contributors_tag, 'person_name')
+            with instrument.section('contributors', parent):
+                pass
+        summary = timer.summary()
+        self.assertEqual(list(summary.keys()), ['contributors'])
+        self.assertEqual(summary.get('contributors').get('calls'), 2)
+        self.assertEqual(summary.get('contributors').get('elements'), 3)
+        self.assertTrue(summary.get('contributors').get('seconds') >= 0)
+
+    def test_section_nested_elements(self):
+        """elements added below an existing child tag are counted"""
+        parent = Element('journal_article')
+        relations_program_tag = SubElement(parent, 'rel:program')
+        with instrument.timing() as timer:
+            with instrument.section('datasets', parent):
+                SubElement(relations_program_tag, 'rel:related_item')
+        self.assertEqual(timer.summary().get('datasets').get('elements'), 1)
+
+    def test_section_no_timer(self):
+        """nothing is recorded outside of a timing block"""
+        with instrument.timing() as timer:
+            pass
+        with instrument.section('contributors'):
+            pass
+        self.assertIsNone(instrument.TIMER.get())
+        self.assertEqual(timer.summary(), {})
+
+
+class TestTimer(unittest.TestCase):
+
+    def test_summary(self):
+        timer = instrument.Timer()
+        timer.record('titles', 0.1, 2)
+        timer.record('citation_list', 0.5, 40)
+        timer.record('titles', 0.2, 2)
+        summary = timer.summary()
+        self.assertEqual(list(summary.keys()), ['citation_list', 'titles'])
+        self.assertEqual(summary.get('titles').get('calls'), 2)
+        self.assertEqual(summary.get('titles').get('elements'), 4)
+
+
+class TestSummarise(unittest.TestCase):
+
+    def test_percentile(self):
+        values = [5, 1, 4, 2, 3]
+        self.assertEqual(instrument.percentile(values, 50), 3)
+        self.assertEqual(instrument.percentile(values, 99), 5)
+        self.assertEqual(instrument.percentile([], 50), None)
+
+    def test_summarise(self):
+        summary = instrument.summarise([0.2, 0.1, 0.3])
+        self.assertEqual(summary.get('count'), 3)
+        self.assertEqual(summary.get('min'), 0.1)
+        self.assertEqual(summary.get('p50'), 0.2)
+        self.assertEqual(summary.get('max'), 0.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
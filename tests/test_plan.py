@@ -0,0 +1,114 @@
+import unittest
+import pickle
+import time
+from unittest.mock import patch
+from xml.etree.ElementTree import Element
+from elifecrossref import generate, journal, plan, synthetic
+from tests import create_crossref_config
+
+
+PUB_DATE = time.strptime("2017-07-17 07:17:07", "%Y-%m-%d %H:%M:%S")
+
+
+class TestGenerationPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.crossref_config = create_crossref_config('elife')
+
+    def test_compiled(self):
+        generation_plan = plan.compiled(self.crossref_config)
+        self.assertEqual(generation_plan, self.crossref_config)
+        self.assertIs(plan.compiled(generation_plan), generation_plan)
+        self.assertEqual(generation_plan.component_exclude_types, frozenset(['sub-article']))
+        self.assertTrue(generation_plan.text_mining_xml)
+
+    def test_read_only(self):
+        generation_plan = plan.compiled(self.crossref_config)
+        with self.assertRaises(TypeError):
+            generation_plan['face_markup'] = False
+
+    def test_pickle(self):
+        generation_plan = pickle.loads(pickle.dumps(plan.compiled(self.crossref_config)))
+        self.assertTrue(isinstance(generation_plan, plan.GenerationPlan))
+        self.assertEqual(generation_plan.url_template('doi_pattern').fields,
+                         frozenset(['manuscript']))
+
+    def test_citation_elocation_id_tag_name(self):
+        self.assertEqual(plan.citation_elocation_id_tag_name('4.4.0'), 'first_page')
+        self.assertEqual(plan.citation_elocation_id_tag_name('4.4.1'), 'elocation_id')
+
+    def test_root_attributes(self):
+        self.assertNotIn('xmlns:rel', dict(plan.root_attributes('4.3.5')))
+        self.assertEqual(
+            dict(plan.root_attributes('4.4.1')).get('xmlns:rel'),
+            'http://www.crossref.org/relations.xsd')
+
+
+class TestPlainConfig(unittest.TestCase):
+    """helpers given a plain config read the values they need without compiling a plan"""
+
+    def setUp(self):
+        self.crossref_config = dict(create_crossref_config('elife'))
+        self.generation_plan = plan.compiled(self.crossref_config)
+
+    def test_value(self):
+        for name in plan.CONFIG_VALUES + tuple(plan.RESOLVERS):
+            self.assertEqual(plan.value(self.crossref_config, name),
+                             plan.value(self.generation_plan, name), name)
+
+    def test_url_template(self):
+        self.assertEqual(plan.url_template(self.crossref_config, 'doi_pattern').fields,
+                         self.generation_plan.url_template('doi_pattern').fields)
+        self.assertIsNone(plan.url_template({}, 'doi_pattern'))
+
+    def test_template(self):
+        first_tag = plan.template(self.crossref_config, ('archive_locations',), list, 'ab')
+        self.assertIsNot(
+            plan.template(self.crossref_config, ('archive_locations',), list, 'ab'), first_tag)
+
+    def test_not_compiled(self):
+        with patch.object(plan.GenerationPlan, '__init__', side_effect=AssertionError):
+            body_tag = Element('body')
+            journal.set_journal(
+                body_tag, synthetic.article(index=1), self.crossref_config, PUB_DATE)
+        self.assertIsNotNone(body_tag.find('journal/journal_article/crossmark'))
+
+
+class TestTemplates(unittest.TestCase):
+
+    def test_template(self):
+        generation_plan = plan.compiled(create_crossref_config('elife'))
+        first_tag = generation_plan.template(('archive_locations',), list, 'ab')
+        self.assertIs(generation_plan.template(('archive_locations',), list, 'cd'), first_tag)
+        self.assertEqual(first_tag, ['a', 'b'])
+
+    def test_journal_records(self):
+        c_xml = generate.build_crossref_xml(
+            [synthetic.article(index=1), synthetic.article(index=2)],
+            create_crossref_config('elife'), PUB_DATE, False)
+        journal_tags = c_xml.root.find('body').findall('journal')
+        self.assertEqual(len(journal_tags), 2)
+        self.assertIs(journal_tags[0].find('journal_metadata'),
+                      journal_tags[1].find('journal_metadata'))
+        self.assertIs(journal_tags[0].find('journal_article/crossmark/crossmark_domains'),
+                      journal_tags[1].find('journal_article/crossmark/crossmark_domains'))
+
+
+class TestUrlTemplate(unittest.TestCase):
+
+    def test_url_template(self):
+        url_template = plan.UrlTemplate(
+            'https://cdn.example.org/{manuscript}/elife-{manuscript}{version}.xml')
+        self.assertEqual(url_template.fields, frozenset(['manuscript', 'version']))
+        self.assertTrue(url_template.uses('version', 'doi'))
+        self.assertFalse(url_template.uses('doi'))
+        self.assertEqual(
+            url_template.format(manuscript=1, version='-v1'),
+            'https://cdn.example.org/1/elife-1-v1.xml')
+
+    def test_empty_pattern(self):
+        self.assertFalse(plan.UrlTemplate(''))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from xml.etree.ElementTree import Element, SubElement, Comment
+from elifecrossref import serialize
+
+
+def sample_root():
+    root = Element('doi_batch')
+    root.set('xmlns:jats', 'http://www.ncbi.nlm.nih.gov/JATS1')
+    root.set('version', '4.4.1')
+    root.append(Comment('generated'))
+    head_tag = SubElement(root, 'head')
+    doi_batch_id_tag = SubElement(head_tag, 'doi_batch_id')
+    doi_batch_id_tag.text = 'test-1'
+    SubElement(head_tag, 'registrant')
+    title_tag = SubElement(root, 'title')
+    title_tag.text = 'A "quoted" <title> & '
+    italic_tag = SubElement(title_tag, 'i')
+    italic_tag.text = 'italic'
+    italic_tag.tail = ' text'
+    return root
+
+
+class TestToString(unittest.TestCase):
+
+    def test_tostring(self):
+        expected = (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<doi_batch version="4.4.1" xmlns:jats="http://www.ncbi.nlm.nih.gov/JATS1">'
+            '<!--generated-->'
+            '<head><doi_batch_id>test-1</doi_batch_id><registrant/></head>'
+            '<title>A &quot;quoted&quot; &lt;title&gt; &amp; <i>italic</i> text</title>'
+            '</doi_batch>')
+        self.assertEqual(serialize.tostring(sample_root()), expected)
+
+    def test_tostring_pretty(self):
+        expected = (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<doi_batch version="4.4.1" xmlns:jats="http://www.ncbi.nlm.nih.gov/JATS1">\n'
+            '\t<!--generated-->\n'
+            '\t<head>\n'
+            '\t\t<doi_batch_id>test-1</doi_batch_id>\n'
+            '\t\t<registrant/>\n'
+            '\t</head>\n'
+            '\t<title>\n'
+            '\t\tA &quot;quoted&quot; &lt;title&gt; &amp; \n'
+            '\t\t<i>italic</i>\n'
+            '\t\t text\n'
+            '\t</title>\n'
+            '</doi_batch>\n')
+        self.assertEqual(serialize.tostring(sample_root(), pretty=True, indent='\t'), expected)
+
+
+class TestEscapeData(unittest.TestCase):
+
+    def test_escape_data(self):
+        self.assertEqual(serialize.escape_data('<a href="x">&</a>'),
+                         '&lt;a href=&quot;x&quot;&gt;&amp;&lt;/a&gt;')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import time
+from xml.etree.ElementTree import Element, SubElement
+from elifecrossref import generate, shared, synthetic
+from tests import create_crossref_config
+
+
+PUB_DATE = time.strptime("2017-07-17 07:17:07", "%Y-%m-%d %H:%M:%S")
+
+
+def build_tag(parent, text):
+    tag = SubElement(parent, 'tag')
+    tag.text = text
+
+
+class TestAddSubtree(unittest.TestCase):
+
+    def test_not_sharing(self):
+        parent = Element('parent')
+        shared.add_subtree(parent, ('tag', 'one'), build_tag, 'one')
+        self.assertEqual(parent[0].text, 'one')
+
+    def test_sharing(self):
+        first_parent = Element('parent')
+        second_parent = Element('parent')
+        with shared.sharing() as cache:
+            shared.add_subtree(first_parent, ('tag', 'one'), build_tag, 'one')
+            shared.add_subtree(second_parent, ('tag', 'one'), build_tag, 'one')
+        self.assertEqual(len(cache), 1)
+        self.assertIs(first_parent[0], second_parent[0])
+
+
+class TestCrossrefXMLForConfigs(unittest.TestCase):
+
+    def setUp(self):
+        self.crossref_configs = [
+            create_crossref_config(config_section)
+            for config_section in ['elife', 'cstp', 'bmjopen']]
+        self.articles = [
+            synthetic.article(index=index, contributors=2, refs=3, funding_awards=1)
+            for index in range(1, 4)]
+
+    def test_crossref_xml_for_configs(self):
+        expected = [
+            generate.crossref_xml(self.articles, crossref_config, PUB_DATE, False)
+            for crossref_config in self.crossref_configs]
+        self.assertEqual(
+            generate.crossref_xml_for_configs(
+                self.articles, self.crossref_configs, PUB_DATE, False),
+            expected)
+
+    def test_peer_review(self):
+        expected = [
+            generate.crossref_xml(
+                self.articles, crossref_config, PUB_DATE, False, 'peer_review')
+            for crossref_config in self.crossref_configs]
+        self.assertEqual(
+            generate.crossref_xml_for_configs(
+                self.articles, self.crossref_configs, PUB_DATE, False, 'peer_review'),
+            expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
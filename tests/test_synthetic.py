@@ -0,0 +1,34 @@
+import unittest
+from elifecrossref import generate, synthetic
+from tests import create_crossref_config
+
+
+class TestSyntheticArticle(unittest.TestCase):
+
+    def test_article_sizes(self):
+        article = synthetic.article(
+            contributors=3, refs=4, components=5, datasets=2, funding_awards=6)
+        self.assertEqual(article.doi, '10.7554/eLife.90001')
+        self.assertEqual(len(article.contributors), 3)
+        self.assertEqual(len(article.ref_list), 4)
+        self.assertEqual(len(article.component_list), 5)
+        self.assertEqual(len(article.datasets), 2)
+        self.assertEqual(len(article.funding_awards), 6)
+
+    def test_build_crossref_xml(self):
+        article = synthetic.article(
+            index=2, contributors=3, refs=4, components=5, datasets=2, funding_awards=6)
+        crossref_config = create_crossref_config('elife')
+        c_xml = generate.build_crossref_xml([article], crossref_config, None, False)
+        crossref_xml_string = c_xml.output_xml()
+        self.assertEqual(crossref_xml_string.count('<person_name '), 3)
+        self.assertEqual(crossref_xml_string.count('<citation '), 4)
+        self.assertEqual(crossref_xml_string.count('<component '), 5)
+        self.assertEqual(crossref_xml_string.count('<fr:assertion name="fundgroup">'), 6)
+        self.assertTrue(
+            '<resource>https://elifesciences.org/articles/90002/figures#fig1</resource>'
+            in crossref_xml_string)
+
+
+if __name__ == '__main__':
+    unittest.main()
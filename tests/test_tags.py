@@ -1,7 +1,31 @@
 import unittest
 from xml.etree import ElementTree
 from xml.etree.ElementTree import Element
-from elifecrossref import tags
+from xml.parsers import expat
+from elifetools import xmlio
+from elifecrossref import engine, tags
+
+
+class TestCleanTags(unittest.TestCase):
+
+    def test_clean_tags(self):
+        passes = [
+            ('No tags', None, 'No tags'),
+            ('<italic>A</italic> <sc>B</sc> <bold>&</bold>', None, 'A B &'),
+            ('<p>See <xref ref-type="bibr" rid="bib1">Smith</xref></p>', None, 'See Smith'),
+            ('<inline-formula><mml:math><mml:mi>x</mml:mi></mml:math></inline-formula>', None,
+             'x'),
+            ('<p>A <mml:mi>x</mml:mi> <italic>B</italic></p>', ['<p>', '</p>', '<mml:', '</mml:'],
+             '<p>A <mml:mi>x</mml:mi> B</p>'),
+            ('<not_allowed>!</not_allowed>', None, '<not_allowed>!</not_allowed>'),
+            # nested angle brackets are cleaned one tag at a time
+            ('<<italic>p</italic>>', None, '<p>'),
+            ('<p<italic>>', None, '<p>'),
+        ]
+        for original_string, do_not_clean, expected in passes:
+            self.assertEqual(tags.clean_tags(original_string, do_not_clean), expected)
+            self.assertEqual(
+                tags.clean_tags_in_order(original_string, do_not_clean), expected)
 
 
 class TestAddCleanTag(unittest.TestCase):
@@ -23,5 +47,73 @@ class TestAddCleanTag(unittest.TestCase):
             '<root><subtitle>...polarization, &lt;p&gt;, and its variance...</subtitle></root>')
 
 
+class TestParseInlineTag(unittest.TestCase):
+
+    def test_parse_inline_tag(self):
+        """parsing straight to ElementTree gives the same tags as reparsing with minidom"""
+        passes = [
+            ('', None, ''),
+            ('Plain &amp; simple', None, ''),
+            ('An <i>italic</i> and <b>bold <sub>1</sub></b> title &#945;', None, ''),
+            ('<jats:p>One</jats:p>\n<jats:p>Two <jats:xref ref-type="bibr">2</jats:xref></jats:p>',
+             ['abstract-type'], ' abstract-type="executive-summary" '),
+            ('<p xmlns:mml="http://www.w3.org/1998/Math/MathML">Namespace</p>', None, ''),
+        ]
+        for tag_string, attributes, attributes_text in passes:
+            expected_root = Element('root')
+            minidom_tag = xmlio.reparsed_tag(
+                'title', tag_string, tags.REPARSING_NAMESPACES, attributes_text)
+            tags.append_tag(expected_root, minidom_tag, attributes=attributes)
+            root = Element('root')
+            root.append(tags.parse_inline_tag(
+                'title', tag_string, attributes=attributes, attributes_text=attributes_text))
+            self.assertEqual(ElementTree.tostring(root), ElementTree.tostring(expected_root))
+
+    def test_do_parse_inline_tag(self):
+        self.assertTrue(tags.do_parse_inline_tag('An <i>italic</i> title'))
+        self.assertFalse(tags.do_parse_inline_tag('<mml:math><mml:mi>x</mml:mi></mml:math>'))
+        self.assertFalse(tags.do_parse_inline_tag('A <!-- comment --> title'))
+
+
+@unittest.skipUnless('lxml' in engine.available_engines(), 'lxml is not installed')
+class TestParseInlineTagLxml(unittest.TestCase):
+
+    def test_parse_inline_tag_lxml(self):
+        """the lxml engine gives the same tags as the default engine"""
+        passes = [
+            ('', None, ''),
+            ('Plain &amp; simple', None, ''),
+            ('An <i>italic</i> and <b>bold <sub>1</sub></b> title &#945; tail', None, ''),
+            ('<jats:p>One</jats:p>\n<jats:p>Two <jats:xref ref-type="bibr">2</jats:xref></jats:p>',
+             ['abstract-type'], ' abstract-type="executive-summary" '),
+            ('See <ext-link xlink:href="https://example.org">link</ext-link>', None, ''),
+            ('A <i xml:lang="fr">titre</i>', None, ''),
+            ('A title', ['xml:lang'], ' xml:lang="en" '),
+        ]
+        for tag_string, attributes, attributes_text in passes:
+            expected = ElementTree.tostring(tags.parse_inline_tag(
+                'title', tag_string, attributes=attributes, attributes_text=attributes_text))
+            with engine.using('lxml'):
+                tag = tags.parse_inline_tag(
+                    'title', tag_string, attributes=attributes, attributes_text=attributes_text)
+            self.assertEqual(ElementTree.tostring(tag), expected)
+
+    def test_parse_error(self):
+        """a parsing error is the same error as the default engine"""
+        with engine.using('lxml'):
+            with self.assertRaises(expat.ExpatError):
+                tags.parse_inline_tag('title', 'An <i>unclosed title')
+
+
+class TestAddInlineTag(unittest.TestCase):
+
+    def test_add_inline_tag(self):
+        root = Element('root')
+        tags.add_inline_tag(root, 'title', 'An <italic>italic</italic> & <bold>bold</bold> title')
+        self.assertEqual(
+            ElementTree.tostring(root).decode('utf-8'),
+            '<root><title>An <i>italic</i> &amp; <b>bold</b> title</title></root>')
+
+
 if __name__ == '__main__':
     unittest.main()